@@ -0,0 +1,338 @@
+# Modèle du problème d'emploi du temps utilisé par le chromosome Schedule
+# (professeurs, groupes d'étudiants, salles et cours à placer)
+
+# Stores data about professor
+class Professor:
+    # Initializes professor data
+    def __init__(self, id, name, unavailableHours=0):
+        self.id = id
+        self.name = name
+        # Hours of week when professor is unavailable (bit day * DAY_HOURS + hour)
+        self.unavailableHours = unavailableHours
+        # List of classes that professor teaches
+        self.courseClasses = []
+
+    # Bind professor to course
+    def AddCourseClass(self, courseClass):
+        self.courseClasses.append( courseClass )
+
+    # Returns professor's ID
+    def GetId(self):
+        return self.id
+
+    # Returns professor's name
+    def GetName(self):
+        return self.name
+
+    # Returns bitset of hours of week when professor is unavailable
+    def GetUnavailableHours(self):
+        return self.unavailableHours
+
+    # Returns reference to list of classes that professor teaches
+    def GetCourseClasses(self):
+        return self.courseClasses
+
+
+# Stores data about student group
+class StudentsGroup:
+    # Initializes student group data
+    def __init__(self, id, name, numberOfStudents):
+        self.id = id
+        self.name = name
+        self.numberOfStudents = numberOfStudents
+        # List of classes that group attends
+        self.courseClasses = []
+
+    # Bind group to class
+    def AddClass(self, courseClass):
+        self.courseClasses.append( courseClass )
+
+    # Returns student group ID
+    def GetId(self):
+        return self.id
+
+    # Returns name of student group
+    def GetName(self):
+        return self.name
+
+    # Returns number of students in group
+    def GetNumberOfStudents(self):
+        return self.numberOfStudents
+
+    # Returns reference to list of classes that group attends
+    def GetCourseClasses(self):
+        return self.courseClasses
+
+
+# Stores data about classroom
+class Room:
+    # Initializes room data
+    def __init__(self, id, name, lab, numberOfSeats, equipments=()):
+        self.id = id
+        self.name = name
+        self.lab = lab
+        self.numberOfSeats = numberOfSeats
+        # Equipments available in room (ex. 'PC fixes', 'Projecteur')
+        self.equipments = frozenset( equipments )
+
+    # Returns room ID
+    def GetId(self):
+        return self.id
+
+    # Returns name
+    def GetName(self):
+        return self.name
+
+    # Returns TRUE if room has computers otherwise it returns FALSE
+    def IsLab(self):
+        return self.lab
+
+    # Returns number of seats in room
+    def GetNumberOfSeats(self):
+        return self.numberOfSeats
+
+    # Returns set of equipments available in room
+    def GetEquipments(self):
+        return self.equipments
+
+
+# Stores data about a single class (one course, one professor, one or more groups)
+class CourseClass:
+    # Initializes class object
+    def __init__(self, professor, course, groups, requiresLab, duration, requiredEquipment=()):
+        # Index of class in configuration (fixed by Configuration.AddCourseClass)
+        self.id = None
+        self.professor = professor
+        self.course = course
+        self.groups = groups
+        self.requiresLab = requiresLab
+        self.duration = duration
+        # Equipments the room must provide
+        self.requiredEquipment = frozenset( requiredEquipment )
+        # number of seats (students) required in room
+        self.numberOfSeats = sum( group.GetNumberOfStudents() for group in groups )
+
+        # bind professor and groups to class
+        professor.AddCourseClass( self )
+        for group in groups:
+            group.AddClass( self )
+
+    # Returns TRUE if another class has one or overlapping student groups
+    def GroupsOverlap(self, c):
+        for group in self.groups:
+            if group in c.groups:
+                return True
+        return False
+
+    # Returns TRUE if another class has same professor
+    def ProfessorOverlaps(self, c):
+        return self.professor is c.professor
+
+    # Returns index of class in configuration
+    def GetId(self):
+        return self.id
+
+    # Returns pointer to professor who teaches
+    def GetProfessor(self):
+        return self.professor
+
+    # Returns course (subject) of the class
+    def GetCourse(self):
+        return self.course
+
+    # Returns reference to list of student groups who attend class
+    def GetGroups(self):
+        return self.groups
+
+    # Returns number of seats (students) required in room
+    def GetNumberOfSeats(self):
+        return self.numberOfSeats
+
+    # Returns TRUE if class requires computers in room
+    def IsLabRequired(self):
+        return self.requiresLab
+
+    # Returns set of equipments required in room
+    def GetRequiredEquipment(self):
+        return self.requiredEquipment
+
+    # Returns duration of class in hours
+    def GetDuration(self):
+        return self.duration
+
+
+# Problem instance read by Schedule (variable globale 'instance' du module Schedule)
+class Configuration:
+    # Initialize data
+    def __init__(self):
+        self.professors = {}
+        self.studentGroups = {}
+        # Rooms are indexed by their position in the time-space slots of chromosomes
+        self.rooms = []
+        # Index of each room from its ID
+        self.roomIndex = {}
+        self.courseClasses = []
+        # Conflict matrices : one bitset per class, bit j set if class j shares
+        # a professor (resp. a student group) with the class ; computed on first use
+        self.professorConflicts = None
+        self.groupConflicts = None
+        # Unavailable hours of professor of each class (copie par cours du masque du professeur)
+        self.unavailableHours = None
+        # Room suitability table : one bitset of rooms per class (bit r = room at index r)
+        self.seatRooms = None
+        self.labRooms = None
+        # Indices of rooms satisfying both criteria, per class
+        self.suitableRooms = None
+        # Size of week of the instance (None : valeurs par défaut de Schedule.SetInstance)
+        self.dayHours = None
+        self.daysNum = None
+
+    # Adds professor and returns it
+    def AddProfessor(self, professor):
+        self.professors[ professor.GetId() ] = professor
+        return professor
+
+    # Adds student group and returns it
+    def AddStudentsGroup(self, group):
+        self.studentGroups[ group.GetId() ] = group
+        return group
+
+    # Adds room and returns it
+    def AddRoom(self, room):
+        self.roomIndex[ room.GetId() ] = len( self.rooms )
+        self.rooms.append( room )
+        # la table d'adéquation des salles devra être recalculée
+        self.seatRooms = None
+        return room
+
+    # Adds course class and returns it
+    def AddCourseClass(self, courseClass):
+        courseClass.id = len( self.courseClasses )
+        self.courseClasses.append( courseClass )
+        # les matrices de conflits et la table des salles devront être recalculées
+        self.professorConflicts = None
+        self.groupConflicts = None
+        self.unavailableHours = None
+        self.seatRooms = None
+        return courseClass
+
+    # Returns bitsets of classes sharing a professor with each class
+    def GetProfessorConflicts(self):
+        if self.professorConflicts is None:
+            self.BuildConflicts()
+        return self.professorConflicts
+
+    # Returns bitsets of classes sharing a student group with each class
+    def GetGroupConflicts(self):
+        if self.groupConflicts is None:
+            self.BuildConflicts()
+        return self.groupConflicts
+
+    # Returns bitsets of hours of week when professor of each class is unavailable
+    def GetUnavailableHours(self):
+        if self.unavailableHours is None:
+            self.BuildConflicts()
+        return self.unavailableHours
+
+    # Returns bitsets of rooms having enough seats for each class
+    def GetSeatRooms(self):
+        if self.seatRooms is None:
+            self.BuildRoomSuitability()
+        return self.seatRooms
+
+    # Returns bitsets of rooms providing computers and equipment required by each class
+    def GetLabRooms(self):
+        if self.seatRooms is None:
+            self.BuildRoomSuitability()
+        return self.labRooms
+
+    # Returns indices of rooms suitable for class (empty list if no room is suitable)
+    def GetSuitableRooms(self, index):
+        if self.seatRooms is None:
+            self.BuildRoomSuitability()
+        return self.suitableRooms[ index ]
+
+    # Precomputes class x room suitability table
+    # (remplace les appels à GetNumberOfSeats / IsLab / IsLabRequired dans la fitness)
+    def BuildRoomSuitability(self):
+        self.seatRooms = []
+        self.labRooms = []
+        self.suitableRooms = []
+        for c in self.courseClasses:
+            seats = 0
+            lab = 0
+            suitable = []
+            for r, room in enumerate( self.rooms ):
+                seatsOk = room.GetNumberOfSeats() >= c.GetNumberOfSeats()
+                labOk = ( not c.IsLabRequired() or room.IsLab() ) and c.GetRequiredEquipment() <= room.GetEquipments()
+                if seatsOk:
+                    seats |= 1 << r
+                if labOk:
+                    lab |= 1 << r
+                if seatsOk and labOk:
+                    suitable.append( r )
+            self.seatRooms.append( seats )
+            self.labRooms.append( lab )
+            self.suitableRooms.append( suitable )
+
+    # Precomputes professor and student group conflict matrices
+    # (remplace les appels à ProfessorOverlaps / GroupsOverlap dans la fitness)
+    def BuildConflicts(self):
+        professorMasks = {}
+        groupMasks = {}
+        for c in self.courseClasses:
+            bit = 1 << c.GetId()
+            professorMasks[ c.GetProfessor() ] = professorMasks.get( c.GetProfessor(), 0 ) | bit
+            for group in c.GetGroups():
+                groupMasks[ group ] = groupMasks.get( group, 0 ) | bit
+
+        self.professorConflicts = []
+        self.groupConflicts = []
+        self.unavailableHours = [ c.GetProfessor().GetUnavailableHours() for c in self.courseClasses ]
+        for c in self.courseClasses:
+            notSelf = ~( 1 << c.GetId() )
+            groups = 0
+            for group in c.GetGroups():
+                groups |= groupMasks[ group ]
+            self.professorConflicts.append( professorMasks[ c.GetProfessor() ] & notSelf )
+            self.groupConflicts.append( groups & notSelf )
+
+    # Returns pointer to professor with specified ID
+    def GetProfessorById(self, id):
+        return self.professors.get( id )
+
+    # Returns number of parsed professors
+    def GetNumberOfProfessors(self):
+        return len( self.professors )
+
+    # Returns pointer to student group with specified ID
+    def GetStudentsGroupById(self, id):
+        return self.studentGroups.get( id )
+
+    # Returns number of parsed student groups
+    def GetNumberOfStudentGroups(self):
+        return len( self.studentGroups )
+
+    # Returns pointer to room at specified index
+    def GetRoomById(self, index):
+        return self.rooms[ index ]
+
+    # Returns index of room with specified ID (position in time-space slots)
+    def GetRoomIndex(self, id):
+        return self.roomIndex.get( id )
+
+    # Returns number of parsed rooms
+    def GetNumberOfRooms(self):
+        return len( self.rooms )
+
+    # Returns reference to list of parsed classes
+    def GetCourseClasses(self):
+        return self.courseClasses
+
+    # Returns class at specified index
+    def GetCourseClass(self, index):
+        return self.courseClasses[ index ]
+
+    # Returns number of parsed classes
+    def GetNumberOfCourseClasses(self):
+        return len( self.courseClasses )
@@ -0,0 +1,199 @@
+import hashlib
+import os
+import pickle
+
+import database
+import Schedule
+from Configuration import Configuration, CourseClass, Professor, Room, StudentsGroup
+
+# Grille horaire utilisée par l'algorithme génétique : heure h d'une journée = DAY_START_HOUR + h
+DAY_START_HOUR = 8
+DAY_HOURS = 10   # 8h - 18h
+DAYS_NUM = 5     # Lundi - Vendredi (jours 1 à 5 dans la base)
+
+# Durée (en heures) d'une séance hebdomadaire de chaque cours
+SESSION_HOURS = 2
+
+# Version du format de l'instance compilée (à incrémenter si _compile change)
+SNAPSHOT_VERSION = 4
+
+# Tables lues par le chargeur : l'empreinte de leur contenu invalide l'instantané dès qu'une ligne change
+_SOURCE_TABLES = (
+    'groups',
+    'instructors',
+    'rooms',
+    'subject_groups',
+    'subject_instructors',
+    'subjects',
+    'teacher_unavailability',
+)
+
+
+# Returns path of the compiled instance snapshot of the current database
+def snapshot_path():
+    return database.DB_NAME + '.instance'
+
+
+# Returns fingerprint of source tables : empreinte SHA-256 de toutes leurs lignes
+# (un horodatage à la seconde près ne voit pas deux modifications dans la même seconde)
+def _source_key(cursor, sessionHours):
+    digest = hashlib.sha256()
+    for table in _SOURCE_TABLES:
+        digest.update( table.encode() )
+        cursor.execute( f"SELECT * FROM {table} ORDER BY id" )
+        for row in cursor:
+            digest.update( repr( tuple( row ) ).encode() )
+    return ( SNAPSHOT_VERSION, sessionHours, DAY_START_HOUR, DAY_HOURS, DAYS_NUM, digest.hexdigest() )
+
+
+# Converts weekly unavailability mask of database (bit (jour - 1) * 24 + heure) into GA hours of week
+def _grid_mask(mask):
+    hours = 0
+    for day in range( DAYS_NUM ):
+        day_mask = ( mask >> ( day * database.MASK_DAY_BITS + DAY_START_HOUR ) ) & ( ( 1 << DAY_HOURS ) - 1 )
+        hours |= day_mask << ( day * DAY_HOURS )
+    return hours
+
+
+# Splits a comma separated equipment list ("PC fixes, Projecteur")
+def _parse_equipments(text):
+    return tuple( e.strip() for e in ( text or "" ).split(",") if e.strip() )
+
+
+# Reads all source tables with one set-based query per table and compiles flat instance data
+def _compile(cursor, sessionHours):
+    # indisponibilités : masques par enseignant lus sur ce curseur, comme l'empreinte de _source_key
+    # (le cache de database.get_unavailability_masks peut dater d'avant une modification externe)
+    cursor.execute("SELECT instructor_id, day, start_hour, duration FROM teacher_unavailability")
+    masks = database.unavailability_masks( cursor.fetchall() )
+    cursor.execute("SELECT id, name FROM instructors WHERE active = 1 ORDER BY id")
+    professors = [ ( row['id'], row['name'], _grid_mask( masks.get( row['id'], 0 ) ) ) for row in cursor.fetchall() ]
+
+    cursor.execute("SELECT id, name, student_count FROM groups WHERE active = 1 ORDER BY id")
+    groups = [ tuple( row ) for row in cursor.fetchall() ]
+
+    cursor.execute("SELECT id, name, type, capacity, equipments FROM rooms WHERE active = 1 ORDER BY id")
+    rooms = [ ( row['id'], row['name'], 'labo' in row['type'].lower(), row['capacity'], _parse_equipments( row['equipments'] ) )
+              for row in cursor.fetchall() ]
+
+    cursor.execute("SELECT id, type, required_equipment FROM subjects ORDER BY id")
+    subjects = cursor.fetchall()
+
+    activeGroups = { g[0] for g in groups }
+    activeProfessors = { p[0] for p in professors }
+
+    subjectGroups = {}
+    cursor.execute("SELECT subject_id, group_id FROM subject_groups ORDER BY subject_id, group_id")
+    for subject_id, group_id in cursor.fetchall():
+        if group_id in activeGroups:
+            subjectGroups.setdefault( subject_id, [] ).append( group_id )
+
+    subjectInstructors = {}
+    cursor.execute("SELECT subject_id, instructor_id FROM subject_instructors ORDER BY subject_id, instructor_id")
+    for subject_id, instructor_id in cursor.fetchall():
+        if instructor_id in activeProfessors:
+            subjectInstructors.setdefault( subject_id, [] ).append( instructor_id )
+
+    # Un cours magistral (CM) réunit tous ses groupes ; TD et TP : une séance par groupe,
+    # les enseignants de la matière étant répartis à tour de rôle
+    classes = []
+    for subject in subjects:
+        subject_groups = subjectGroups.get( subject['id'] )
+        instructors = subjectInstructors.get( subject['id'] )
+        if not subject_groups or not instructors:
+            continue
+        requiresLab = subject['type'] == 'TP'
+        equipment = _parse_equipments( subject['required_equipment'] )
+        if subject['type'] == 'CM':
+            classes.append( ( subject['id'], instructors[0], tuple( subject_groups ), requiresLab, sessionHours, equipment ) )
+        else:
+            for k, group_id in enumerate( subject_groups ):
+                classes.append( ( subject['id'], instructors[ k % len( instructors ) ], ( group_id, ), requiresLab, sessionHours, equipment ) )
+
+    return { 'professors': professors, 'groups': groups, 'rooms': rooms, 'classes': classes }
+
+
+# Builds Configuration objects from compiled instance data
+def _build(data):
+    configuration = Configuration()
+    # grille des masques d'indisponibilité et de schedule_to_slots, reprise par GeneticAlgorithm
+    configuration.dayHours = DAY_HOURS
+    configuration.daysNum = DAYS_NUM
+    for id, name, unavailableHours in data['professors']:
+        configuration.AddProfessor( Professor( id, name, unavailableHours ) )
+    for id, name, student_count in data['groups']:
+        configuration.AddStudentsGroup( StudentsGroup( id, name, student_count ) )
+    for id, name, lab, capacity, equipments in data['rooms']:
+        configuration.AddRoom( Room( id, name, lab, capacity, equipments ) )
+    for subject_id, instructor_id, group_ids, requiresLab, duration, equipment in data['classes']:
+        configuration.AddCourseClass( CourseClass( configuration.GetProfessorById( instructor_id ), subject_id,
+                                                   [ configuration.GetStudentsGroupById( g ) for g in group_ids ],
+                                                   requiresLab, duration, equipment ) )
+    return configuration
+
+
+# Loads GA problem instance from university_schedule.db
+# L'instance compilée (données + matrices précalculées) est mise en cache dans un fichier binaire,
+# rechargé tel quel tant que les tables sources n'ont pas changé
+def load_configuration(useSnapshot=True, sessionHours=SESSION_HOURS):
+    conn = database.getConnection()
+    cursor = conn.cursor()
+    try:
+        key = _source_key( cursor, sessionHours )
+
+        path = snapshot_path()
+        if useSnapshot and os.path.exists( path ):
+            try:
+                with open( path, 'rb' ) as f:
+                    snapshot = pickle.load( f )
+            except ( OSError, pickle.UnpicklingError, EOFError ):
+                snapshot = None
+            if snapshot is not None and snapshot['key'] == key:
+                configuration = _build( snapshot['data'] )
+                configuration.professorConflicts, configuration.groupConflicts, configuration.unavailableHours = snapshot['conflicts']
+                configuration.seatRooms, configuration.labRooms, configuration.suitableRooms = snapshot['rooms']
+                return configuration
+
+        data = _compile( cursor, sessionHours )
+    finally:
+        conn.close()
+
+    configuration = _build( data )
+    # précalcul une fois pour toutes au chargement
+    configuration.BuildConflicts()
+    configuration.BuildRoomSuitability()
+
+    if useSnapshot:
+        snapshot = {
+            'key': key,
+            'data': data,
+            'conflicts': ( configuration.professorConflicts, configuration.groupConflicts, configuration.unavailableHours ),
+            'rooms': ( configuration.seatRooms, configuration.labRooms, configuration.suitableRooms ),
+        }
+        # écriture atomique : un lecteur concurrent ne voit jamais un fichier partiel
+        tmp = path + '.tmp'
+        with open( tmp, 'wb' ) as f:
+            pickle.dump( snapshot, f, protocol=pickle.HIGHEST_PROTOCOL )
+        os.replace( tmp, path )
+
+    return configuration
+
+
+# Converts class -> position map of a solved Schedule into timetable rows (one row per group)
+def schedule_to_slots(schedule, configuration):
+    dayHours = configuration.dayHours or Schedule.DAY_HOURS
+    daySize = dayHours * configuration.GetNumberOfRooms()
+    slots = []
+    for cc, p in schedule.GetClasses().items():
+        day = p // daySize
+        time = ( p % daySize ) % dayHours
+        room = configuration.GetRoomById( ( p % daySize ) // dayHours )
+        for group in cc.GetGroups():
+            slots.append( ( cc.GetCourse(), cc.GetProfessor().GetId(), group.GetId(), room.GetId(),
+                            day + 1, DAY_START_HOUR + time, cc.GetDuration() ) )
+    return slots
+
+
+# Replaces the timetable rows of a semester by the solved Schedule, in one transaction
+def publish_schedule(schedule, configuration, semester, created_by=None):
+    return database.replace_semester_timetable( semester, schedule_to_slots( schedule, configuration ), created_by )
@@ -0,0 +1,176 @@
+import time
+from random import randint
+
+import Schedule
+
+# Genetic algorithm evolving a population of Schedule chromosomes
+class GeneticAlgorithm:
+    # Initializes genetic algorithm
+    # configuration : instance du problème (Configuration) partagée par tous les chromosomes
+    def __init__(self, configuration, numberOfChromosomes=100, replaceByGeneration=8, trackBest=5,
+                 numberOfCrossoverPoints=2, mutationSize=2, crossoverProbability=80, mutationProbability=3,
+                 tournamentSize=3, compact=True, incremental=True, restrictRooms=False,
+                 dayHours=None, daysNum=None):
+        # Les chromosomes lisent l'instance et la taille de la semaine dans le module Schedule
+        # (par défaut celle de l'instance, ex. la grille 8h-18h de ConfigurationLoader)
+        Schedule.SetInstance( configuration, dayHours, daysNum )
+
+        # Prototype of chromosomes in population
+        self.prototype = Schedule.Schedule( numberOfCrossoverPoints, mutationSize, crossoverProbability,
+                                            mutationProbability, compact, incremental, restrictRooms )
+
+        # there should be at least 2 chromosomes in population
+        if numberOfChromosomes < 2:
+            numberOfChromosomes = 2
+        # and algorithm should track at least one of best chromosomes
+        if trackBest < 1:
+            trackBest = 1
+        # Number of chromosomes which are replaced in each generation by offspring
+        if replaceByGeneration < 1:
+            replaceByGeneration = 1
+        elif replaceByGeneration > numberOfChromosomes - trackBest:
+            replaceByGeneration = numberOfChromosomes - trackBest
+
+        self.replaceByGeneration = replaceByGeneration
+        self.tournamentSize = max( 1, tournamentSize )
+        # Population of chromosomes
+        self.chromosomes = numberOfChromosomes * [None]
+        # Indicates whether chromosome belongs to best chromosome group
+        self.bestFlags = numberOfChromosomes * [False]
+        # Indices of best chromosomes, best first
+        self.bestChromosomes = trackBest * [0]
+        # Number of best chromosomes currently saved in best chromosome group
+        self.currentBestSize = 0
+        # Current generation
+        self.currentGeneration = 0
+        # Throughput of the last run
+        self.generationsPerSecond = 0.0
+
+    # Fills population with random chromosomes
+    # codes : codes sérialisés (Schedule.GetCode) utilisés en priorité pour reconstruire la population
+    def Initialize(self, codes=None):
+        self.ClearBest()
+        codes = codes or []
+        for i in range( len( self.chromosomes ) ):
+            if i < len( codes ):
+                self.chromosomes[ i ] = self.prototype.MakeFromCode( codes[ i ] )
+            else:
+                self.chromosomes[ i ] = self.prototype.MakeNewFromPrototype()
+            self.AddToBest( i )
+        self.currentGeneration = 0
+
+    # Replaces the worst chromosome by a migrant given as serialized code
+    def Immigrate(self, code):
+        ci = self.Worst()
+        self.chromosomes[ ci ] = self.prototype.MakeFromCode( code )
+        self.AddToBest( ci )
+
+    # Starts and executes algorithm
+    # Arrêt quand la fitness atteint minFitness, quand toutes les contraintes dures sont
+    # satisfaites (stopOnFeasible) ou après maxGenerations générations
+    def Run(self, maxGenerations=10000, minFitness=1.0, stopOnFeasible=True, initialize=True):
+        if initialize or self.chromosomes[ 0 ] is None:
+            self.Initialize()
+
+        start = time.perf_counter()
+        firstGeneration = self.currentGeneration
+        while self.currentGeneration - firstGeneration < maxGenerations:
+            best = self.GetBestChromosome()
+            if best.GetFitness() >= minFitness or ( stopOnFeasible and all( best.criteria ) ):
+                break
+            self.NextGeneration()
+
+        elapsed = time.perf_counter() - start
+        generations = self.currentGeneration - firstGeneration
+        self.generationsPerSecond = generations / elapsed if elapsed > 0 else 0.0
+        return self.GetBestChromosome()
+
+    # Produces offspring which replace the worst chromosomes of population
+    def NextGeneration(self):
+        for j in range( self.replaceByGeneration ):
+            p1 = self.chromosomes[ self.Select() ]
+            p2 = self.chromosomes[ self.Select() ]
+
+            # le chromosome remplacé prête ses tampons à l'enfant : pas de réallocation
+            # (sauf s'il a été sélectionné comme parent)
+            ci = self.Worst()
+            target = self.chromosomes[ ci ]
+            if target is p1 or target is p2:
+                target = None
+            offspring = p1.Crossover( p2, target )
+            offspring.Mutation()
+
+            self.chromosomes[ ci ] = offspring
+            self.AddToBest( ci )
+
+        self.currentGeneration += 1
+
+    # Tournament selection : returns index of the fittest of tournamentSize random chromosomes
+    def Select(self):
+        size = len( self.chromosomes )
+        best = randint( 0, size - 1 )
+        for i in range( self.tournamentSize - 1 ):
+            ci = randint( 0, size - 1 )
+            if self.chromosomes[ ci ].GetFitness() > self.chromosomes[ best ].GetFitness():
+                best = ci
+        return best
+
+    # Returns index of the worst chromosome which is not in best chromosome group
+    def Worst(self):
+        worst = -1
+        for i, c in enumerate( self.chromosomes ):
+            if self.bestFlags[ i ]:
+                continue
+            if worst < 0 or c.GetFitness() < self.chromosomes[ worst ].GetFitness():
+                worst = i
+        return worst
+
+    # Returns pointer to best chromosome in population
+    def GetBestChromosome(self):
+        return self.chromosomes[ self.bestChromosomes[ 0 ] ]
+
+    # Returns current generation
+    def GetCurrentGeneration(self):
+        return self.currentGeneration
+
+    # Tries to add chromosome in best chromosome group
+    def AddToBest(self, chromosomeIndex):
+        # don't add if new chromosome hasn't fitness big enough for best chromosome group
+        # or it is already in the group?
+        if ( self.currentBestSize == len( self.bestChromosomes ) and
+             self.chromosomes[ self.bestChromosomes[ self.currentBestSize - 1 ] ].GetFitness() >=
+             self.chromosomes[ chromosomeIndex ].GetFitness() ) or self.bestFlags[ chromosomeIndex ]:
+            return
+
+        # find place for new chromosome
+        i = self.currentBestSize
+        while i > 0:
+            # group is not full?
+            if i < len( self.bestChromosomes ):
+                # position of new chromosomes is found?
+                if self.chromosomes[ self.bestChromosomes[ i - 1 ] ].GetFitness() > \
+                   self.chromosomes[ chromosomeIndex ].GetFitness():
+                    break
+                # move chromosomes to make room for new
+                self.bestChromosomes[ i ] = self.bestChromosomes[ i - 1 ]
+            else:
+                # group is full remove worst chromosomes in the group
+                self.bestFlags[ self.bestChromosomes[ i - 1 ] ] = False
+            i -= 1
+
+        # store chromosome in best chromosome group
+        self.bestChromosomes[ i ] = chromosomeIndex
+        self.bestFlags[ chromosomeIndex ] = True
+
+        # increase current size if it has not reached the limit yet
+        if self.currentBestSize < len( self.bestChromosomes ):
+            self.currentBestSize += 1
+
+    # Returns TRUE if chromosome belongs to best chromosome group
+    def IsInBest(self, chromosomeIndex):
+        return self.bestFlags[ chromosomeIndex ]
+
+    # Clears best chromosome group
+    def ClearBest(self):
+        self.bestFlags = len( self.bestFlags ) * [False]
+        self.currentBestSize = 0
@@ -0,0 +1,107 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+from GeneticAlgorithm import GeneticAlgorithm
+
+# Île de chaque processus de travail : algorithme génétique créé une seule fois par _InitIsland,
+# dont la population (déjà évaluée) est conservée d'une époque à l'autre
+_island = None
+
+
+# Initializes worker process with problem instance and island algorithm
+def _InitIsland(configuration, parameters):
+    global _island
+    _island = GeneticAlgorithm( configuration, **parameters )
+
+
+# Evolves the island of this worker for a number of generations
+# Retourne (codes des numberOfMigrants meilleurs chromosomes, meilleure fitness, contraintes dures satisfaites,
+# générations)
+def _EvolveIsland(immigrants, numberOfMigrants, generations, minFitness, stopOnFeasible, seed):
+    random.seed( seed )
+    ga = _island
+    if ga.chromosomes[ 0 ] is None:
+        ga.Initialize()
+    for code in immigrants:
+        ga.Immigrate( code )
+
+    firstGeneration = ga.GetCurrentGeneration()
+    best = ga.Run( generations, minFitness, stopOnFeasible, initialize=False )
+
+    # seuls les migrants (et le meilleur chromosome) quittent le processus
+    population = sorted( ga.chromosomes, key=lambda c: c.GetFitness(), reverse=True )
+    return ( [ c.GetCode() for c in population[ : max( 1, numberOfMigrants ) ] ], best.GetFitness(),
+             all( best.criteria ), ga.GetCurrentGeneration() - firstGeneration )
+
+
+# Island model : independent populations evolved in parallel processes (one process per island, which keeps
+# its population between epochs), best chromosomes migrate to the next island (ring) every migrationInterval
+# generations
+class IslandModel:
+    # Initializes island model
+    # parameters : paramètres de GeneticAlgorithm appliqués à chaque île
+    def __init__(self, configuration, numberOfIslands=None, migrationInterval=50, numberOfMigrants=2, **parameters):
+        self.configuration = configuration
+        # one island per core by default
+        self.numberOfIslands = max( 1, numberOfIslands or os.cpu_count() or 1 )
+        self.migrationInterval = max( 1, migrationInterval )
+        self.numberOfMigrants = numberOfMigrants
+        self.parameters = parameters
+
+        # le processus principal a aussi besoin de l'instance pour reconstruire le meilleur chromosome
+        self.prototype = GeneticAlgorithm( configuration, **parameters ).prototype
+
+        # Generations evolved by all islands in the last run
+        self.currentGeneration = 0
+        # Throughput of the last run, summed over islands
+        self.generationsPerSecond = 0.0
+
+    # Starts and executes algorithm on all islands
+    # Retourne le meilleur chromosome trouvé sur l'ensemble des îles
+    def Run(self, maxGenerations=10000, minFitness=1.0, stopOnFeasible=True):
+        n = self.numberOfIslands
+        immigrants = [ [] for _ in range( n ) ]
+        bestCode = None
+        bestFitness = -1.0
+        totalGenerations = 0
+        self.currentGeneration = 0
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            # un exécuteur d'un seul processus par île : chaque époque retrouve la même population
+            executors = [ stack.enter_context( ProcessPoolExecutor( max_workers=1, initializer=_InitIsland,
+                                                                    initargs=( self.configuration, self.parameters ) ) )
+                          for _ in range( n ) ]
+            # au moins une époque : avec maxGenerations <= 0, chaque île renvoie son meilleur chromosome initial
+            # (comme GeneticAlgorithm.Run)
+            while True:
+                generations = max( 0, min( self.migrationInterval, maxGenerations - self.currentGeneration ) )
+                futures = [ executors[ i ].submit( _EvolveIsland, immigrants[ i ], self.numberOfMigrants, generations,
+                                                   minFitness, stopOnFeasible, random.getrandbits( 32 ) )
+                            for i in range( n ) ]
+                results = [ f.result() for f in futures ]
+
+                finished = False
+                for i, ( codes, fitness, feasible, evolved ) in enumerate( results ):
+                    totalGenerations += evolved
+                    if fitness > bestFitness:
+                        bestFitness = fitness
+                        bestCode = codes[ 0 ]
+                    if fitness >= minFitness or ( stopOnFeasible and feasible ):
+                        finished = True
+
+                    # migration : les meilleurs chromosomes de l'île i partent vers l'île suivante
+                    immigrants[ ( i + 1 ) % n ] = codes[ : self.numberOfMigrants ] if n > 1 else []
+
+                self.currentGeneration += generations
+                if finished or self.currentGeneration >= maxGenerations:
+                    break
+
+        elapsed = time.perf_counter() - start
+        self.generationsPerSecond = totalGenerations / elapsed if elapsed > 0 else 0.0
+
+        # reconstruction du meilleur chromosome dans le processus principal
+        return self.prototype.MakeFromCode( bestCode )
@@ -0,0 +1,188 @@
+import numpy as np
+
+import Schedule
+
+# Une table de comptage dense n'est allouée que si elle a au plus DENSE_KEYS_FACTOR fois plus de cases que
+# d'entrées à compter (voir PopulationEvaluator._Compact)
+DENSE_KEYS_FACTOR = 4
+
+# Vectorized fitness evaluation of a whole population of Schedule chromosomes
+# Donne les mêmes valeurs que Schedule.CalculateFitness, mais pour toute une génération à la fois
+class PopulationEvaluator:
+    # Precomputes per-class and per-room tables of the problem instance
+    def __init__(self, configuration=None):
+        if configuration is None:
+            configuration = Schedule.instance
+        # grille de l'instance (ex. 10 x 5 de ConfigurationLoader), comme ConfigurationLoader.schedule_to_slots
+        self.dayHours = configuration.dayHours or Schedule.DAY_HOURS
+        self.daysNum = configuration.daysNum or Schedule.DAYS_NUM
+        self.numberOfRooms = configuration.GetNumberOfRooms()
+
+        classes = configuration.GetCourseClasses()
+        self.numberOfClasses = len( classes )
+
+        # critères 1 et 2 : table d'adéquation (cours, salle) précalculée par l'instance
+        self.seatsOk = self._RoomTable( configuration.GetSeatRooms() )
+        self.labOk = self._RoomTable( configuration.GetLabRooms() )
+        # critère 3 : heures de la semaine où le professeur de chaque cours est indisponible
+        numberOfHours = self.daysNum * self.dayHours
+        self.unavailable = np.array( [ [ bool( ( m >> h ) & 1 ) for h in range( numberOfHours ) ]
+                                       for m in configuration.GetUnavailableHours() ],
+                                     dtype=bool ).reshape( self.numberOfClasses, numberOfHours )
+
+        # une entrée par heure de chaque cours : cours concerné et décalage depuis le début
+        duration = np.array( [ c.GetDuration() for c in classes ], dtype=np.int64 )
+        starts = np.cumsum( duration ) - duration
+        self.hourClass = np.repeat( np.arange( self.numberOfClasses ), duration )
+        self.hourOffset = np.arange( len( self.hourClass ) ) - np.repeat( starts, duration )
+
+        # professeurs : identité pour les chevauchements, nom pour les contraintes douces
+        professors = {}
+        professorNames = {}
+        self.professor = np.array( [ professors.setdefault( id( c.GetProfessor() ), len( professors ) ) for c in classes ], dtype=np.int64 )
+        self.professorName = np.array( [ professorNames.setdefault( c.GetProfessor().GetName(), len( professorNames ) ) for c in classes ], dtype=np.int64 )
+        self.numberOfProfessors = len( professors )
+        self.numberOfProfessorNames = len( professorNames )
+
+        # couples (cours, groupe)
+        groups = {}
+        groupNames = {}
+        pairClass = []
+        pairGroup = []
+        pairGroupName = []
+        for ci, c in enumerate( classes ):
+            for group in c.GetGroups():
+                pairClass.append( ci )
+                pairGroup.append( groups.setdefault( id( group ), len( groups ) ) )
+                pairGroupName.append( groupNames.setdefault( group.GetName(), len( groupNames ) ) )
+        self.pairClass = np.array( pairClass, dtype=np.int64 )
+        self.pairGroup = np.array( pairGroup, dtype=np.int64 )
+        self.pairGroupName = np.array( pairGroupName, dtype=np.int64 )
+        self.numberOfGroups = len( groups )
+        self.numberOfGroupNames = len( groupNames )
+
+        # triplets (heure de cours, groupe) pour les chevauchements de groupes
+        hoursOfClass = [ np.flatnonzero( self.hourClass == ci ) for ci in range( self.numberOfClasses ) ]
+        self.tripleHour = np.array( [ h for ci, g in zip( pairClass, pairGroup ) for h in hoursOfClass[ ci ] ], dtype=np.int64 )
+        self.tripleGroup = np.array( [ g for ci, g in zip( pairClass, pairGroup ) for h in hoursOfClass[ ci ] ], dtype=np.int64 )
+
+    # Evaluates population given as 2-D array of class positions (one row per chromosome)
+    # Retourne (fitness, critères, score) : tableaux de forme (C,), (C, 5 * nombre de cours), (C,)
+    def Evaluate(self, positions):
+        P = np.asarray( positions, dtype=np.int64 )
+        if P.ndim == 1:
+            P = P[ None, : ]
+        C, N = P.shape
+        dh = self.dayHours
+        daySize = dh * self.numberOfRooms
+        numberOfSlots = self.daysNum * daySize
+        numberOfHours = self.daysNum * dh
+        rows = np.arange( C )[ :, None ]
+
+        day = P // daySize
+        time = ( P % daySize ) % dh
+        room = ( P % daySize ) // dh
+        # heure de la semaine occupée par chaque heure de cours
+        hour = ( day * dh + time )[ :, self.hourClass ] + self.hourOffset
+
+        # 0 : chevauchement de salle (plus d'un cours dans le même créneau temps-salle)
+        slots = P[ :, self.hourClass ] + self.hourOffset
+        roomOverlap = self._AnyByClass( self._Multiplicity( rows * numberOfSlots + slots, C * numberOfSlots ) > 1, self.hourClass, C, N )
+
+        # 1 et 2 : places assises et salle informatique
+        seatsOk = self.seatsOk[ np.arange( N )[ None, : ], room ]
+        labOk = self.labOk[ np.arange( N )[ None, : ], room ]
+
+        # 3 : un autre cours du même professeur à la même heure, ou professeur indisponible
+        key = ( rows * self.numberOfProfessors + self.professor[ self.hourClass ] ) * numberOfHours + hour
+        unavailable = self.unavailable[ self.hourClass[ None, : ], hour ]
+        professorOverlap = self._AnyByClass( ( self._Multiplicity( key, C * self.numberOfProfessors * numberOfHours ) > 1 ) | unavailable, self.hourClass, C, N )
+
+        # 4 : un autre cours d'un même groupe à la même heure
+        key = ( rows * self.numberOfGroups + self.tripleGroup ) * numberOfHours + hour[ :, self.tripleHour ]
+        groupOverlap = self._AnyByClass( self._Multiplicity( key, C * self.numberOfGroups * numberOfHours ) > 1, self.hourClass[ self.tripleHour ], C, N )
+
+        criteria = np.stack( [ ~roomOverlap, seatsOk, labOk, ~professorOverlap, ~groupOverlap ], axis=2 ).reshape( C, N * 5 )
+        score = criteria.sum( axis=1 )
+
+        # contraintes douces, comptées par (entité, jour) occupé comme dans Schedule
+        groupChromosome, groupCount, groupMin, groupMax = self._DailyStats( C, self.numberOfGroupNames, self.pairGroupName,
+                                                                            day[ :, self.pairClass ], time[ :, self.pairClass ] )
+        isolated = self._SumByChromosome( groupChromosome, groupCount == 1, C )
+        gaps = self._SumByChromosome( groupChromosome, ( groupCount > 1 ) & ( ( groupMax - groupMin ) - ( groupCount - 1 ) > 2 ), C )
+
+        professorChromosome, professorCount, professorMin, professorMax = self._DailyStats( C, self.numberOfProfessorNames,
+                                                                                            self.professorName, day, time )
+        coreEnd = dh - 2
+        extreme = self._SumByChromosome( professorChromosome, professorMin < Schedule.CORE_START, C ) + \
+                  self._SumByChromosome( professorChromosome, professorMax > coreEnd, C )
+        bonus = self._SumByChromosome( professorChromosome, ( professorMax - professorMin + 1 == professorCount ) &
+                                       ( professorMin >= Schedule.CORE_START ) & ( professorMax <= coreEnd ), C )
+
+        soft_penalty = isolated * Schedule.PUNISHMENT_ISOLATED_CLASS + gaps * Schedule.PUNISHMENT_FOR_GAPS + extreme * Schedule.PUNISHMENT_EXTREME_HOURS
+        soft_bonus = bonus * Schedule.BONUS_CORE_HOURS
+        total_score = score + soft_bonus - soft_penalty
+        soft_factor = self.numberOfGroupNames * Schedule.PUNISHMENT_ISOLATED_CLASS + self.numberOfProfessorNames * Schedule.PUNISHMENT_EXTREME_HOURS
+        fitness = total_score / ( N * 5 + soft_factor + 0.001 )
+
+        return fitness, criteria, total_score
+
+    # Evaluates Schedule chromosomes and stores fitness, criteria and score in each of them
+    def EvaluateChromosomes(self, chromosomes):
+        positions = np.stack( [ np.frombuffer( c.GetCode(), dtype=np.int32 ) for c in chromosomes ] )
+        fitness, criteria, score = self.Evaluate( positions )
+        for c, f, cr, s in zip( chromosomes, fitness.tolist(), criteria.tolist(), score.tolist() ):
+            c.fitness = f
+            c.criteria = cr
+            c.score = s
+            c._state = None
+        return fitness
+
+    # Converts per-class room bitsets into a boolean (classes x rooms) array
+    def _RoomTable(self, bitsets):
+        return np.array( [ [ bool( ( b >> r ) & 1 ) for r in range( self.numberOfRooms ) ] for b in bitsets ],
+                         dtype=bool ).reshape( len( bitsets ), self.numberOfRooms )
+
+    # Reduces per-entry flags to one flag per (chromosome, class)
+    def _AnyByClass(self, flags, entryClass, C, N):
+        index = ( np.arange( C )[ :, None ] * N + entryClass ).ravel()
+        return np.bincount( index, weights=flags.ravel(), minlength=C * N ).reshape( C, N ) > 0
+
+    # Compacts keys in [0, size) : (clés distinctes triées, indice de la clé de chaque entrée, nombre d'entrées par clé)
+    # La mémoire suit le nombre d'heures placées : table dense seulement si size est du même ordre que le nombre
+    # d'entrées, sinon tri des clés (ex. 100 chromosomes x 2000 groupes x 50 heures)
+    def _Compact(self, key, size):
+        key = key.ravel()
+        if size <= DENSE_KEYS_FACTOR * len( key ):
+            counts = np.bincount( key, minlength=size )
+            keys = np.flatnonzero( counts )
+            position = np.empty( size, dtype=np.int64 )
+            position[ keys ] = np.arange( len( keys ) )
+            return keys, position[ key ], counts[ keys ]
+        order = np.argsort( key )
+        sortedKeys = key[ order ]
+        first = np.flatnonzero( np.concatenate( ( [ True ], sortedKeys[ 1 : ] != sortedKeys[ : -1 ] ) ) )
+        counts = np.diff( np.append( first, len( key ) ) )
+        inverse = np.empty( len( key ), dtype=np.int64 )
+        inverse[ order ] = np.repeat( np.arange( len( first ) ), counts )
+        return sortedKeys[ first ], inverse, counts
+
+    # Number of entries sharing the key of each entry (keys in [0, size))
+    def _Multiplicity(self, key, size):
+        keys, inverse, counts = self._Compact( key, size )
+        return counts[ inverse ].reshape( key.shape )
+
+    # Sums per-entry flags by chromosome
+    def _SumByChromosome(self, chromosome, flags, C):
+        return np.bincount( chromosome, weights=flags, minlength=C ).astype( np.int64 )
+
+    # Chromosome, number, min and max of start hours of each occupied (chromosome, entity, day)
+    def _DailyStats(self, C, numberOfEntities, entity, day, time):
+        key = ( ( np.arange( C )[ :, None ] * numberOfEntities + entity ) * self.daysNum + day ).ravel()
+        keys, inverse, count = self._Compact( key, C * numberOfEntities * self.daysNum )
+        time = time.ravel()
+        low = np.full( len( keys ), self.dayHours, dtype=np.int64 )
+        high = np.full( len( keys ), -1, dtype=np.int64 )
+        np.minimum.at( low, inverse, time )
+        np.maximum.at( high, inverse, time )
+        return keys // ( numberOfEntities * self.daysNum ), count, low, high
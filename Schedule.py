@@ -1,14 +1,83 @@
-import copy
 import random
+from array import array
 from random import randint
-# NOTE : DAY_HOURS et DAYS_NUM sont définis dans votre code principal
-# DAY_HOURS = 4  # Number of working hours per day
-# DAYS_NUM = 5   # Number of days in week
+# NOTE : DAY_HOURS, DAYS_NUM et instance sont fixés par SetInstance (voir GeneticAlgorithm.py)
+DAY_HOURS = 4  # Number of working hours per day
+DAYS_NUM = 5   # Number of days in week
+# Problem instance (Configuration) shared by all chromosomes
+instance = None
+
+# Sets problem instance and size of the week used by all chromosomes
+# dayHours et daysNum : taille de la semaine, par défaut celle de l'instance (Configuration.dayHours/daysNum)
+def SetInstance(configuration, dayHours=None, daysNum=None):
+    global instance, DAY_HOURS, DAYS_NUM
+    if dayHours is None:
+        dayHours = configuration.dayHours if configuration.dayHours is not None else 4
+    if daysNum is None:
+        daysNum = configuration.daysNum if configuration.daysNum is not None else 5
+    instance = configuration
+    DAY_HOURS = dayHours
+    DAYS_NUM = daysNum
+    _emptyOccupancy.clear()
+
+# Tableaux d'occupation vides, par taille, pour réinitialiser un chromosome recyclé sans allocation
+_emptyOccupancy = {}
+
+# --- Définitions pour le calcul des Soft Constraints ---
+PUNISHMENT_ISOLATED_CLASS = 0.2
+PUNISHMENT_FOR_GAPS = 0.15
+BONUS_CORE_HOURS = 0.1
+PUNISHMENT_EXTREME_HOURS = 0.2
+CORE_START = 1 # Slot 1 (heure de début '1')
+
+# Soft-constraint tallies of one group for one day : [isolés, trous, horaires extrêmes, bonus]
+def _GroupDayCounts(times):
+    # SOFT 1 : Étalement des cours par jour pour les GROUPES (Isolé)
+    if len(times) == 1:
+        return ( 1, 0, 0, 0 )
+    # SOFT 2 : Minimisation des "trous" pour les GROUPES (Gaps)
+    # Simplifié : s'il y a plus de 2 heures libres entre min et max
+    if len(times) > 1 and (max(times) - min(times)) - (len(times) - 1) > 2:
+        return ( 0, 1, 0, 0 )
+    return ( 0, 0, 0, 0 )
+
+# Soft-constraint tallies of one professor for one day
+def _ProfessorDayCounts(times):
+    if not times:
+        return ( 0, 0, 0, 0 )
+    CORE_END = DAY_HOURS - 2 # Slot 2 (heure de fin '2') si DAY_HOURS=4
+    min_time = min(times)
+    max_time = max(times)
+    extreme = 0
+    bonus = 0
+    # Pénalité pour commencer trop tôt (slot 0)
+    if min_time < CORE_START:
+        extreme += 1
+    # Pénalité pour finir trop tard (dernier slot)
+    if max_time > CORE_END:
+        extreme += 1
+    # Bonus pour un travail compact au milieu de la journée
+    # Si l'écart est petit et que tous les cours sont dans la fenêtre (CORE_START à CORE_END)
+    if (max_time - min_time + 1) == len(times) and min_time >= CORE_START and max_time <= CORE_END:
+        bonus += 1
+    return ( 0, 0, extreme, bonus )
+
+# Adds (or removes, sign=-1) soft-constraint tallies
+def _AddSoftCounts(soft, counts, sign=1):
+    for k in range( 4 ):
+        soft[ k ] += sign * counts[ k ]
 
 # Schedule chromosome
 class Schedule:
+    # Mode debug : chaque évaluation incrémentale est comparée au recalcul complet
+    checkIncremental = False
+
     # Initializes chromosomes with configuration block (setup of chromosome)
-    def __init__(self, numberOfCrossoverPoints, mutationSize, crossoverProbability, mutationProbability):
+    # compact=True : le code est stocké dans des tableaux d'entiers (position de chaque cours
+    # + nombre de cours par créneau) au lieu de listes d'objets CourseClass
+    # incremental=True : après une mutation, seuls les cours déplacés et leurs voisins sont réévalués
+    # restrictRooms=True : placement aléatoire limité aux salles adaptées au cours (places, équipements)
+    def __init__(self, numberOfCrossoverPoints, mutationSize, crossoverProbability, mutationProbability, compact=False, incremental=False, restrictRooms=False):
         # Number of crossover points of parent's class tables
         self.numberOfCrossoverPoints = numberOfCrossoverPoints
         # Number of classes that is moved randomly by single mutation operation
@@ -25,45 +94,90 @@ class Schedule:
         self.criteria = []
         self.score = 0
         self.classes = {}
+        # Représentation choisie pour le code du chromosome
+        self.compact = compact
+        # Évaluation incrémentale de la fitness et état associé (construit par CalculateFitness)
+        self.incremental = incremental
+        self._state = None
+        self.restrictRooms = restrictRooms
         # Assurez-vous que DAY_HOURS, DAYS_NUM et instance sont définis globalement
-        self.slots = ( DAYS_NUM * DAY_HOURS * instance.GetNumberOfRooms() ) * [None]
+        numberOfSlots = DAYS_NUM * DAY_HOURS * instance.GetNumberOfRooms()
+        if compact:
+            # Position de chaque cours, indexée dans l'ordre de instance.GetCourseClasses()
+            self.positions = array( 'i', [ 0 ] ) * instance.GetNumberOfCourseClasses()
+            # Nombre de cours occupant chaque créneau temps-salle
+            self.occupancy = array( 'H', [ 0 ] ) * numberOfSlots
+        else:
+            self.slots = numberOfSlots * [None]
         self.criteria = (instance.GetNumberOfCourseClasses() * 5 )* [None] 
 
     # Returns reference to table of classes
     def GetClasses(self):
+        if self.compact:
+            # En mode compact la table est reconstruite à la demande à partir des positions
+            return dict( zip( instance.GetCourseClasses(), self.positions ) )
         return self.classes
 
+    # Returns (class, position) pairs of chromosome's code
+    def _Placements(self):
+        if self.compact:
+            return zip( instance.GetCourseClasses(), self.positions )
+        return self.classes.items()
+
     # Imitates copy constructor in C++
-    def copy(self, setupOnly):
+    # target : chromosome de même représentation dont les tampons sont réutilisés au lieu d'être réalloués
+    def copy(self, setupOnly, target=None):
         #return copy.deepcopy(self)
-        c = Schedule(0,0,0,0)
+        if target is None:
+            # le constructeur réserve déjà l'espace pour le code et les flags
+            c = Schedule(0,0,0,0, self.compact, self.incremental)
+        else:
+            c = target
+            c._Reset( setupOnly )
         
         if not setupOnly:
             # copy code
-            # Note: Utiliser copy.copy(self.slots) pour éviter des références partagées non désirées
-            c.slots = copy.deepcopy(self.slots)
-            c.classes = copy.deepcopy(self.classes)
+            if self.compact:
+                # simple copie des tampons : aucun objet CourseClass n'est dupliqué
+                c.positions[:] = self.positions
+                c.occupancy[:] = self.occupancy
+            else:
+                # Les listes des créneaux sont copiées mais les CourseClass restent partagés :
+                # un deepcopy dupliquait chaque cours (et cassait la comparaison dans Mutation)
+                c.slots = [ None if s is None else s[:] for s in self.slots ]
+                c.classes = dict( self.classes )
 
             # copy flags of class requirements
-            c.criteria = copy.copy(self.criteria)
+            c.criteria[:] = self.criteria
 
             # copy fitness
             c.fitness = self.fitness
-        else:
-            # reserve space for time-space slots in chromosomes code
-            c.slots = ( DAYS_NUM * DAY_HOURS * instance.GetNumberOfRooms() ) * [None]
-
-            # reserve space for flags of class requirements
-            c.criteria = ( instance.GetNumberOfCourseClasses() * 5 ) * [None]
 
         # copy parameters
         c.numberOfCrossoverPoints = self.numberOfCrossoverPoints
         c.mutationSize = self.mutationSize
         c.crossoverProbability = self.crossoverProbability
         c.mutationProbability = self.mutationProbability
+        c.restrictRooms = self.restrictRooms
         c.score = self.score
 
         return c
+
+    # Clears code of recycled chromosome (setupOnly) and drops incremental state
+    def _Reset(self, setupOnly):
+        self._state = None
+        self.fitness = 0
+        if not setupOnly:
+            # le code sera entièrement recopié
+            return
+        if self.compact:
+            size = len( self.occupancy )
+            if size not in _emptyOccupancy:
+                _emptyOccupancy[ size ] = array( 'H', [ 0 ] ) * size
+            self.occupancy[:] = _emptyOccupancy[ size ]
+        else:
+            self.slots = len( self.slots ) * [None]
+            self.classes = {}
              
     # Makes new chromosome with same setup but with randomly chosen code
     def MakeNewFromPrototype(self):
@@ -75,50 +189,86 @@ class Schedule:
             c = instance.GetCourseClasses()
             nr = instance.GetNumberOfRooms()
             maxLength = nr * DAY_HOURS * DAYS_NUM
-            for it in c:
+            for ci, it in enumerate( c ):
                 # determine random position of class
                 dur = it.GetDuration()
                 day = randint(0,32767) % DAYS_NUM
-                room = randint(0, 32767) % nr
+                room = self._RandomRoom( ci )
                 # Assurez-vous que l'heure de début est valide (DAY_HOURS - dur)
                 time = randint(0, 32767) % (DAY_HOURS - dur + 1)
                 pos = day * nr * DAY_HOURS + room * DAY_HOURS + time
-                
-                # fill time-space slots, for each hour of class
-                for i in range( dur - 1, -1, -1 ):
-                    if newChromosome.slots[ pos + i ] is None:
-                        newChromosome.slots[ pos + i ] = [ it ]
-                    else:
-                        newChromosome.slots[ pos + i ].append( it )
 
-                # insert in class table of chromosome
-                newChromosome.classes[ it ] = pos
+                newChromosome._Place( ci, it, pos )
 
             newChromosome.CalculateFitness()
 
             # return smart pointer
             return newChromosome
 
+    # Makes new chromosome with same setup from code produced by GetCode
+    def MakeFromCode(self, code):
+        positions = array( 'i' )
+        positions.frombytes( code )
+        newChromosome = self.copy(True)
+        for ci, it in enumerate( instance.GetCourseClasses() ):
+            newChromosome._Place( ci, it, positions[ ci ] )
+        newChromosome.CalculateFitness()
+        return newChromosome
+
+    # Returns compact serialized code : position of each class, in instance.GetCourseClasses() order
+    def GetCode(self):
+        if self.compact:
+            return self.positions.tobytes()
+        return array( 'i', [ self.classes[ cc ] for cc in instance.GetCourseClasses() ] ).tobytes()
+
+    # Returns random room index for class ci, among suitable rooms if placement is restricted
+    def _RandomRoom(self, ci):
+        if self.restrictRooms:
+            rooms = instance.GetSuitableRooms( ci )
+            # aucune salle adaptée : on garde un placement libre
+            if rooms:
+                return rooms[ randint(0, 32767) % len( rooms ) ]
+        return randint(0, 32767) % instance.GetNumberOfRooms()
+
+    # Places class cc (index ci) at position pos in empty chromosome's code
+    def _Place(self, ci, cc, pos):
+        dur = cc.GetDuration()
+        if self.compact:
+            self.positions[ ci ] = pos
+            for i in range( dur - 1, -1, -1 ):
+                self.occupancy[ pos + i ] += 1
+            return
+
+        # fill time-space slots, for each hour of class
+        for i in range( dur - 1, -1, -1 ):
+            if self.slots[ pos + i ] is None:
+                self.slots[ pos + i ] = [ cc ]
+            else:
+                self.slots[ pos + i ].append( cc )
+
+        # insert in class table of chromosome
+        self.classes[ cc ] = pos
+
     # Performes crossover operation using two chromosomes and returns pointer to offspring
-    def Crossover(self, parent2):
+    # target : chromosome recyclé (remplacé dans la population) qui reçoit le code de l'enfant
+    def Crossover(self, parent2, target=None):
         # check probability of crossover operation
         if randint(0, 32767) % 100 > self.crossoverProbability:
             # no crossover, just copy first parent
-            return self.copy(False)
+            return self.copy(False, target)
 
         # new chromosome object, copy chromosome setup
-        n = self.copy(True)
+        n = self.copy(True, target)
 
         # number of classes
-        size = len(self.classes)
+        size = len(self.positions) if self.compact else len(self.classes)
         cp = size * [None]
 
         # determine crossover point (randomly)
         for i in range( self.numberOfCrossoverPoints, 0, -1 ):
             while 1:
-                # Utilisez len(self.classes) au lieu de 'size' car size est fixe.
                 # Utilisez une meilleure source de hasard si possible.
-                p = randint( 0, 32767 ) % len(self.classes.keys())
+                p = randint( 0, 32767 ) % size
                 if (not cp[ p ]):
                     cp[ p ] = True
                     break
@@ -127,6 +277,25 @@ class Schedule:
         
         # make new code by combining parent codes
         first = randint( 0, 1 ) == 0
+
+        if self.compact:
+            # on copie des tranches entières de positions entre deux points de croisement
+            start = 0
+            for i in range( 0, size ):
+                if cp[ i ] or i == size - 1:
+                    source = self if first else parent2
+                    n.positions[ start : i + 1 ] = source.positions[ start : i + 1 ]
+                    start = i + 1
+                    if cp[ i ]:
+                        first = not first
+
+            # puis on recompte l'occupation des créneaux
+            for cc, pos in zip( instance.GetCourseClasses(), n.positions ):
+                for k in range( cc.GetDuration() - 1, -1, -1 ):
+                    n.occupancy[ pos + k ] += 1
+
+            n.CalculateFitness()
+            return n
         
         # NOTE : Cette section de Crossover est complexe en Python à cause de l'itération
         # sur les dictionnaires. J'ai corrigé l'accès aux clés pour assurer la compatibilité.
@@ -178,29 +347,43 @@ class Schedule:
             if randint(0, 32767) % 100 > self.mutationProbability:
                 return None
 
+            if self.compact:
+                class_keys = instance.GetCourseClasses()
+            else:
+                class_keys = list(self.classes.keys())
+
             # number of classes
-            numberOfClasses = len(self.classes)
-            # number of time-space slots
-            size = len(self.slots)
+            numberOfClasses = len(class_keys)
 
-            class_keys = list(self.classes.keys())
+            # évaluation incrémentale possible si l'état de la dernière évaluation complète existe
+            incremental = self.incremental and self._state is not None
             
             # move selected number of classes at random position
             for i in range(self.mutationSize, 0, -1):
                 # select random chromosome for movement
                 mpos = randint(0, 32767) % numberOfClasses
                 cc1 = class_keys[ mpos ]
-                pos1 = self.classes[ cc1 ]
+                pos1 = self.positions[ mpos ] if self.compact else self.classes[ cc1 ]
 
                 # determine position of class randomly
                 nr = instance.GetNumberOfRooms()
                 dur = cc1.GetDuration()
                 day = randint(0, 32767) % DAYS_NUM
-                room = randint(0, 32767) % nr
+                room = self._RandomRoom( cc1.GetId() )
                 # Assurez-vous que l'heure de début est valide (DAY_HOURS - dur)
                 time = randint(0, 32767) % ( DAY_HOURS - dur + 1 )
                 pos2 = day * nr * DAY_HOURS + room * DAY_HOURS + time
 
+                if self.compact:
+                    # déplacement = mise à jour des compteurs d'occupation
+                    for j in range( dur - 1, -1, -1 ):
+                        self.occupancy[ pos1 + j ] -= 1
+                        self.occupancy[ pos2 + j ] += 1
+                    self.positions[ mpos ] = pos2
+                    if incremental:
+                        self._UpdateAfterMove( cc1, pos1, pos2 )
+                    continue
+
                 # move all time-space slots
                 for j in range( dur - 1, -1, -1 ):
                     # remove class hour from current time-space slot
@@ -223,8 +406,23 @@ class Schedule:
 
                 # change entry of class table to point to new time-space slots
                 self.classes[ cc1 ] = pos2
-                
-            self.CalculateFitness()
+                if incremental:
+                    self._UpdateAfterMove( cc1, pos1, pos2 )
+
+            if not incremental:
+                self.CalculateFitness()
+                return None
+
+            state = self._state
+            self._SetFitness( state[ 'score' ], state[ 'soft' ], len( state[ 'groups' ] ), len( state[ 'professors' ] ) )
+
+            if Schedule.checkIncremental:
+                # recalcul complet sur une copie et comparaison
+                check = self.copy( False )
+                check.incremental = False
+                check.CalculateFitness()
+                if check.criteria != self.criteria or abs( check.fitness - self.fitness ) > 1e-9:
+                    raise RuntimeError( "Fitness incrémentale divergente : %s au lieu de %s" % ( self.fitness, check.fitness ) )
 
     # Calculates fitness value of chromosome
     def CalculateFitness(self):
@@ -239,152 +437,114 @@ class Schedule:
         group_schedule = {} # { 'GroupeID': { 'JourID': [liste_des_heures_de_début] } }
         professor_schedule = {} # { 'ProfID': { 'JourID': [liste_des_heures_de_début] } }
 
-        # --- Définitions pour le calcul des Soft Constraints ---
-        PUNISHMENT_ISOLATED_CLASS = 0.2
-        PUNISHMENT_FOR_GAPS = 0.15
-        BONUS_CORE_HOURS = 0.1
-        PUNISHMENT_EXTREME_HOURS = 0.2
-        CORE_START = 1 # Slot 1 (heure de début '1')
-        CORE_END = DAY_HOURS - 2 # Slot 2 (heure de fin '2') si DAY_HOURS=4
+        # Cours présents à chaque heure de la semaine, toutes salles confondues, sous forme
+        # de bitset (bit = identifiant du cours) : évite de parcourir les créneaux de toutes les salles
+        hourClasses = ( DAYS_NUM * DAY_HOURS ) * [ 0 ]
+        for i, p in self._Placements():
+            h = ( p // daySize ) * DAY_HOURS + ( p % daySize ) % DAY_HOURS
+            bit = 1 << i.GetId()
+            for j in range( i.GetDuration() - 1, -1, -1 ):
+                hourClasses[ h + j ] |= bit
+
+        # Index de chaque cours dans le tableau des critères
+        classIndex = {}
 
         # 1. Calcul des contraintes DURES (Hard Constraints) et Remplissage des données Soft
-        for i in self.classes.keys():
+        for i, p in self._Placements():
             # coordinate of time-space slot
-            p = self.classes[ i ]
             day = p // daySize
             time_slot_index = (p % daySize) % DAY_HOURS # L'heure de début comme index
-            room_index = (p % daySize) // DAY_HOURS
             
             # --- Remplissage des structures Soft ---
-            groups = i.GetGroups()
-            professor = i.GetProfessor() 
-
-            for group in groups:
+            for group in i.GetGroups():
                 group_id = group.GetName()
                 group_schedule.setdefault(group_id, {}).setdefault(day, []).append(time_slot_index)
             
-            prof_id = professor.GetName()
+            prof_id = i.GetProfessor().GetName()
             professor_schedule.setdefault(prof_id, {}).setdefault(day, []).append(time_slot_index)
             # --- Fin du Remplissage ---
-            
-            dur = i.GetDuration()
-
-            # check for room overlapping of classes
-            ro = False
-            for j in range( dur - 1, -1, -1 ):
-                if self.slots[ p + j ] is not None and len( self.slots[ p + j ] ) > 1:
-                    ro = True
-                    break
-
-            # on room overlapping
-            if not ro:
-                score = score + 1
-
-            self.criteria[ ci + 0 ] = not ro
-                
-            cc = i
-            r = instance.GetRoomById( room_index ) # Utilisation de l'index de salle
-            # does current room have enough seats
-            self.criteria[ ci + 1 ] = r.GetNumberOfSeats() >= cc.GetNumberOfSeats()
-            if self.criteria[ ci + 1 ]:
-                score = score + 1
-
-            # does current room have computers if they are required
-            self.criteria[ ci + 2 ] = ( not cc.IsLabRequired() ) or ( cc.IsLabRequired() and r.IsLab() )
-            if self.criteria[ ci + 2 ]:
-                score = score + 1
-
-            po = False
-            go = False
-            # check overlapping of classes for professors and student groups (dans d'autres salles au même moment)
-            t = day * daySize + time_slot_index
-            
-            breakPoint = False
-            for k in range( numberOfRooms, 0, -1 ): # Parcourt toutes les salles à la même heure/jour
-                if breakPoint == True: break
-                
-                for l in range( dur - 1, -1, -1 ): # Parcourt la durée du cours
-                    if breakPoint == True: break
-                    
-                    # Index dans le tableau slots pour une autre salle (k) et une heure donnée (l)
-                    slot_index_check = day * daySize + (k-1) * DAY_HOURS + time_slot_index + l
-                    
-                    cl = self.slots[ slot_index_check ] 
-                    
-                    if cl is not None:
-                        for it in cl:
-                            if breakPoint == True: break
-                            if cc != it:
-                                # professor overlaps?
-                                if not po and cc.ProfessorOverlaps( it ):
-                                    po = True
-                                # student group overlaps?
-                                if not go and cc.GroupsOverlap( it ):
-                                    go = True
-                                # both type of overlapping? no need to check more
-                                if po and go:
-                                    breakPoint = True
-                                        
-                t = t + DAY_HOURS # Cela semble être une erreur de logique de votre code original
-            
-            # professors have no overlapping classes?
-            if not po:
-                score = score + 1
-            self.criteria[ ci + 3 ] = not po
 
-            # student groups has no overlapping classes?
-            if not go:
-                score = score + 1
-            self.criteria[ ci + 4 ] = not go
+            criteria = self._ClassCriteria( i, p, hourClasses )
+            self.criteria[ ci : ci + 5 ] = criteria
+            score += sum( criteria )
 
+            classIndex[ i ] = ci
             ci += 5
         
         # --- NOUVELLE SECTION : Contraintes DOUCES (Soft Constraints) ---
-        soft_penalty = 0
-        soft_bonus = 0
+        # Les contraintes douces sont comptées (nombre de jours isolés, avec trous, etc.)
+        # pour pouvoir être mises à jour par jour et par entité lors d'une mutation
+        soft = [ 0, 0, 0, 0 ]
 
-        # SOFT 1 : Étalement des cours par jour pour les GROUPES (Isolé)
+        # SOFT 1 et 2 : cours isolés et "trous" pour les GROUPES
         for group_id, daily_schedule in group_schedule.items():
             for day, times in daily_schedule.items():
-                if len(times) == 1:
-                    soft_penalty += PUNISHMENT_ISOLATED_CLASS
+                _AddSoftCounts( soft, _GroupDayCounts( times ) )
 
-        # SOFT 2 : Minimisation des "trous" pour les GROUPES (Gaps)
-        for group_id, daily_schedule in group_schedule.items():
-            for day, times in daily_schedule.items():
-                if len(times) > 1:
-                    min_time = min(times)
-                    max_time = max(times)
-                    
-                    # On calcule le nombre d'heures occupées (durée totale des cours)
-                    total_duration = sum(instance.GetCourseClass(t).GetDuration() for t in times)
-                    
-                    # L'étendue réelle est (max_time - min_time) + durée du dernier cours
-                    # Si l'étendue est BEAUCOUP plus grande que la durée totale, il y a des trous.
-                    
-                    # Simplifié : s'il y a plus de 2 heures libres entre min et max
-                    if (max_time - min_time) - (len(times) - 1) > 2:
-                        soft_penalty += PUNISHMENT_FOR_GAPS
-        
         # SOFT 3 : Préférence d'horaires pour les ENSEIGNANTS
         for prof_id, daily_schedule in professor_schedule.items():
             for day, times in daily_schedule.items():
-                if not times: continue
-                
-                min_time = min(times)
-                max_time = max(times)
-                
-                # Pénalité pour commencer trop tôt (slot 0)
-                if min_time < CORE_START:
-                     soft_penalty += PUNISHMENT_EXTREME_HOURS
-                # Pénalité pour finir trop tard (dernier slot)
-                if max_time > CORE_END: 
-                     soft_penalty += PUNISHMENT_EXTREME_HOURS
-                
-                # Bonus pour un travail compact au milieu de la journée
-                # Si l'écart est petit et que tous les cours sont dans la fenêtre (CORE_START à CORE_END)
-                if (max_time - min_time + 1) == len(times) and min_time >= CORE_START and max_time <= CORE_END:
-                     soft_bonus += BONUS_CORE_HOURS
+                _AddSoftCounts( soft, _ProfessorDayCounts( times ) )
+
+        if self.incremental:
+            # conservation de l'état nécessaire à l'évaluation incrémentale des mutations
+            self._state = {
+                'hourClasses': hourClasses,
+                'classIndex': classIndex,
+                'groups': group_schedule,
+                'professors': professor_schedule,
+                'score': score,
+                'soft': soft,
+            }
+
+        self._SetFitness( score, soft, len(group_schedule), len(professor_schedule) )
+
+    # Computes the five hard-constraint flags of class cc placed at position p
+    def _ClassCriteria(self, cc, p, hourClasses):
+        numberOfRooms = instance.GetNumberOfRooms()
+        daySize = DAY_HOURS * numberOfRooms
+        day = p // daySize
+        time_slot_index = (p % daySize) % DAY_HOURS
+        room_index = (p % daySize) // DAY_HOURS
+        dur = cc.GetDuration()
+
+        # check for room overlapping of classes
+        ro = False
+        for j in range( dur - 1, -1, -1 ):
+            if self.compact:
+                if self.occupancy[ p + j ] > 1:
+                    ro = True
+                    break
+            elif self.slots[ p + j ] is not None and len( self.slots[ p + j ] ) > 1:
+                ro = True
+                break
+
+        # does current room have enough seats (table précalculée par l'instance)
+        seats = bool( ( instance.GetSeatRooms()[ cc.GetId() ] >> room_index ) & 1 )
+        # does current room have computers and equipment if they are required
+        lab = bool( ( instance.GetLabRooms()[ cc.GetId() ] >> room_index ) & 1 )
+
+        # check overlapping of classes for professors and student groups (dans d'autres salles au même moment)
+        t = day * DAY_HOURS + time_slot_index
+
+        # Tous les cours donnés pendant ce cours, quelle que soit la salle
+        busy = 0
+        for l in range( dur - 1, -1, -1 ): # Parcourt la durée du cours
+            busy |= hourClasses[ t + l ]
+
+        # professor / student group overlaps? (matrices de conflits précalculées par l'instance)
+        # un professeur indisponible à l'une de ces heures compte comme un chevauchement
+        po = ( instance.GetProfessorConflicts()[ cc.GetId() ] & busy ) != 0 or \
+             ( instance.GetUnavailableHours()[ cc.GetId() ] >> t ) & ( ( 1 << dur ) - 1 ) != 0
+        go = ( instance.GetGroupConflicts()[ cc.GetId() ] & busy ) != 0
+
+        return [ not ro, seats, lab, not po, not go ]
+
+    # Computes final fitness from hard score and soft-constraint tallies
+    def _SetFitness(self, score, soft, numberOfGroups, numberOfProfessors):
+        isolated, gaps, extreme, bonus = soft
+        soft_penalty = isolated * PUNISHMENT_ISOLATED_CLASS + gaps * PUNISHMENT_FOR_GAPS + extreme * PUNISHMENT_EXTREME_HOURS
+        soft_bonus = bonus * BONUS_CORE_HOURS
 
         # Calcul final de la Fitness
         max_hard_score = instance.GetNumberOfCourseClasses() * 5
@@ -392,12 +552,67 @@ class Schedule:
         
         # Normalisation de la fitness. Nous ajoutons un petit facteur aux contraintes douces
         # pour éviter la division par zéro et pour laisser de la place à l'amélioration.
-        soft_factor = len(group_schedule) * PUNISHMENT_ISOLATED_CLASS + len(professor_schedule) * PUNISHMENT_EXTREME_HOURS
+        soft_factor = numberOfGroups * PUNISHMENT_ISOLATED_CLASS + numberOfProfessors * PUNISHMENT_EXTREME_HOURS
         
         self.fitness = total_score / (max_hard_score + soft_factor + 0.001) 
         
         self.score = total_score
 
+    # Updates incremental fitness state after class cc moved from pos1 to pos2
+    # Seuls les cours partageant une heure avec l'ancienne ou la nouvelle position
+    # et les couples (entité, jour) concernés sont réévalués
+    def _UpdateAfterMove(self, cc, pos1, pos2):
+        state = self._state
+        hourClasses = state[ 'hourClasses' ]
+        daySize = DAY_HOURS * instance.GetNumberOfRooms()
+        dur = cc.GetDuration()
+        day1, time1 = pos1 // daySize, ( pos1 % daySize ) % DAY_HOURS
+        day2, time2 = pos2 // daySize, ( pos2 % daySize ) % DAY_HOURS
+
+        # cours dont les critères durs peuvent changer
+        bit = 1 << cc.GetId()
+        affected = bit
+        for j in range( dur - 1, -1, -1 ):
+            h = day1 * DAY_HOURS + time1 + j
+            hourClasses[ h ] &= ~bit
+            affected |= hourClasses[ h ]
+        for j in range( dur - 1, -1, -1 ):
+            h = day2 * DAY_HOURS + time2 + j
+            affected |= hourClasses[ h ]
+            hourClasses[ h ] |= bit
+
+        while affected:
+            # bit de poids faible = prochain cours concerné
+            low = affected & -affected
+            affected ^= low
+            it = instance.GetCourseClass( low.bit_length() - 1 )
+            ci = state[ 'classIndex' ][ it ]
+            p = self.positions[ ci // 5 ] if self.compact else self.classes[ it ]
+            criteria = self._ClassCriteria( it, p, hourClasses )
+            state[ 'score' ] += sum( criteria ) - sum( self.criteria[ ci : ci + 5 ] )
+            self.criteria[ ci : ci + 5 ] = criteria
+
+        # contraintes douces : seuls les jours quittés / rejoints changent
+        soft = state[ 'soft' ]
+        entities = [ ( state[ 'groups' ], g.GetName(), _GroupDayCounts ) for g in cc.GetGroups() ]
+        entities.append( ( state[ 'professors' ], cc.GetProfessor().GetName(), _ProfessorDayCounts ) )
+        for schedule, name, counts in entities:
+            daily_schedule = schedule[ name ]
+            days = { day1, day2 }
+            for day in days:
+                if day in daily_schedule:
+                    _AddSoftCounts( soft, counts( daily_schedule[ day ] ), -1 )
+
+            times = daily_schedule[ day1 ]
+            times.remove( time1 )
+            if not times:
+                del daily_schedule[ day1 ]
+            daily_schedule.setdefault( day2, [] ).append( time2 )
+
+            for day in days:
+                if day in daily_schedule:
+                    _AddSoftCounts( soft, counts( daily_schedule[ day ] ) )
+
     # Returns fitness value of chromosome
     def GetFitness(self):
         return self.fitness
\ No newline at end of file
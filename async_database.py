@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+
+# Threads de lecture ; les écritures passent par un thread unique (SQLite n'a qu'un écrivain à la fois,
+# et la vérification de conflit d'insert_schedule_slot reste ainsi suivie de son insertion)
+READ_WORKERS = 4
+# Appels en attente au-delà desquels les appelants attendent avant d'être mis en file
+MAX_PENDING = 256
+
+
+class AsyncDatabase:
+    """
+    Équivalents asynchrones des helpers de database.py, exécutés hors de la boucle d'événements :
+        db = AsyncDatabase()
+        message = await db.check_conflict(instructor_id, group_id, room_id, day, start_hour, duration)
+    Chaque thread des exécuteurs a sa propre connexion (pool par thread de database.getConnection).
+    Les lectures identiques simultanées sont fusionnées en un seul appel ; les check_conflict d'un même
+    tour de boucle sont regroupés en un check_conflicts_batch.
+    """
+
+    def __init__(self, read_workers=READ_WORKERS, max_pending=MAX_PENDING):
+        self.readers = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="db-read")
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write")
+        self.slots = asyncio.Semaphore(max_pending)
+        # lectures en cours : (nom, arguments) -> future partagée par les appelants
+        self.inflight = {}
+        # check_conflict en attente du prochain lot : [(candidat, future)]
+        self.pending_checks = []
+
+        # Métriques (mises à jour par les threads des exécuteurs)
+        self.metrics_lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.submitted = 0
+        self.completed = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.batched_checks = 0
+        self.wait_seconds = 0.0
+
+    async def _run(self, executor, function, *args):
+        async with self.slots:
+            with self.metrics_lock:
+                self.queued += 1
+                self.submitted += 1
+                self.max_queued = max(self.max_queued, self.queued)
+            submitted_at = time.perf_counter()
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, self._call, submitted_at, function, args)
+
+    def _call(self, submitted_at, function, args):
+        with self.metrics_lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_seconds += time.perf_counter() - submitted_at
+        try:
+            return function(*args)
+        finally:
+            with self.metrics_lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def _read(self, function, *args):
+        # une lecture identique déjà en cours est partagée au lieu d'être relancée
+        key = (function.__name__, args)
+        future = self.inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(self._run(self.readers, function, *args))
+        self.inflight[key] = future
+        future.add_done_callback(lambda done: self.inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    # --- LECTURES ---
+
+    async def get_id_by_name(self, table, name_col, name_value):
+        return await self._read(database.get_id_by_name, table, name_col, name_value)
+
+    async def get_user_id_by_username(self, username):
+        return await self._read(database.get_id_by_name, "users", "username", username)
+
+    async def resolve_ids(self, table, name_col, names):
+        return await self._read(database.resolve_ids, table, name_col, tuple(names))
+
+    async def get_weekly_timetable(self, kind, entity_id, semester=None):
+        return await self._read(database.get_weekly_timetable, kind, entity_id, semester)
+
+    async def timetable_version(self):
+        return await self._read(database.timetable_version)
+
+    async def check_conflict(self, instructor_id, group_id, room_id, day, start_hour, duration):
+        """ Même résultat que database.check_conflict ; les appels d'un même tour de boucle partent en un lot. """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self.pending_checks:
+            loop.call_soon(self._flush_checks)
+        self.pending_checks.append(((instructor_id, group_id, room_id, day, start_hour, duration), future))
+        return await future
+
+    def _flush_checks(self):
+        pending, self.pending_checks = self.pending_checks, []
+        self.batches += 1
+        self.batched_checks += len(pending)
+        batch = asyncio.ensure_future(self._read(database.check_conflicts_batch, tuple(c for c, f in pending)))
+
+        def resolve(done):
+            for position, (candidate, future) in enumerate(pending):
+                if future.done():
+                    continue
+                if done.exception() is not None:
+                    future.set_exception(done.exception())
+                else:
+                    future.set_result(done.result()[position])
+        batch.add_done_callback(resolve)
+
+    async def check_conflicts_batch(self, candidates):
+        return await self._read(database.check_conflicts_batch, tuple(tuple(c) for c in candidates))
+
+    # --- ÉCRITURES ---
+
+    async def insert_schedule_slot(self, course_id, instructor_id, group_id, room_id, day, start_hour, duration,
+                                   created_by=None):
+        return await self._run(self.writer, database.insert_schedule_slot, course_id, instructor_id, group_id,
+                               room_id, day, start_hour, duration, created_by)
+
+    async def replace_semester_timetable(self, semester, slots, created_by=None):
+        return await self._run(self.writer, database.replace_semester_timetable, semester, list(slots), created_by)
+
+    # --- MÉTRIQUES ---
+
+    def stats(self):
+        """ Profondeur de file et compteurs d'appels (attente moyenne en ms avant exécution). """
+        with self.metrics_lock:
+            started = self.completed + self.running
+            return {
+                'queued': self.queued,
+                'running': self.running,
+                'max_queued': self.max_queued,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'coalesced': self.coalesced,
+                'batches': self.batches,
+                'batched_checks': self.batched_checks,
+                'mean_wait_ms': self.wait_seconds / started * 1000 if started else 0.0,
+            }
+
+    def close(self):
+        """ Attend la fin des appels en cours et arrête les threads (connexions : database.close_connections). """
+        self.readers.shutdown(wait=True)
+        self.writer.shutdown(wait=True)
@@ -0,0 +1,131 @@
+import database
+
+# Grille horaire d'une journée : bit (h - FIRST_HOUR) d'un masque = heure h
+FIRST_HOUR = 8
+LAST_HOUR = 18
+FULL_DAY = (1 << (LAST_HOUR - FIRST_HOUR)) - 1
+
+# Types d'entités suivies par le moteur
+KINDS = ('instructor', 'group', 'room')
+
+
+def hours_mask(start_hour, duration):
+    """ Masque des heures [start_hour, start_hour + duration) comprises dans la grille. """
+    start = max(start_hour, FIRST_HOUR)
+    end = min(start_hour + duration, LAST_HOUR)
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << (start - FIRST_HOUR)
+
+
+def window_starts(free, duration):
+    """ Masque des heures de début d'une plage libre de 'duration' heures consécutives dans 'free'. """
+    starts = free
+    for k in range(1, duration):
+        starts &= free >> k
+    return starts
+
+
+class AvailabilityEngine:
+    """
+    Disponibilités des enseignants, groupes et salles sous forme de masques d'heures libres
+    par entité et par jour (timetable, teacher_unavailability et réservations approuvées).
+    Chercher un créneau commun revient à intersecter des masques avec des opérations bit à bit.
+    """
+
+    def __init__(self):
+        # type -> {(entity_id, jour): masque des heures occupées}
+        self.busy = {kind: {} for kind in KINDS}
+        # Salles actives (capacité, id, nom, salle informatique), par capacité croissante
+        self.rooms = []
+
+    @classmethod
+    def from_database(cls):
+        """ Construit le moteur à partir de la base courante (une requête par table). """
+        engine = cls()
+        conn = database.getConnection()
+        try:
+            for row in conn.execute("SELECT instructor_id, group_id, room_id, day, start_hour, duration FROM timetable"):
+                engine.mark_busy(row[0], row[1], row[2], *row[3:])
+            for row in conn.execute("""
+                SELECT instructor_id, group_id, room_id, day, start_hour, duration
+                FROM reservations WHERE status = 'APPROVED'
+            """):
+                engine.mark_busy(row[0], row[1], row[2], *row[3:])
+            for row in conn.execute("SELECT id, name, type, capacity FROM rooms WHERE active = 1"):
+                engine.rooms.append((row['capacity'], row['id'], row['name'], 'labo' in row['type'].lower()))
+        finally:
+            conn.close()
+        engine.rooms.sort()
+
+        # indisponibilités : masques hebdomadaires précalculés par database, ramenés à la grille du jour
+        busy = engine.busy['instructor']
+        for instructor_id, mask in database.get_unavailability_masks().items():
+            for day in database.DAYS:
+                hours = mask >> ((day - 1) * database.MASK_DAY_BITS + FIRST_HOUR) & FULL_DAY
+                if hours:
+                    busy[(instructor_id, day)] = busy.get((instructor_id, day), 0) | hours
+        return engine
+
+    def mark_busy(self, instructor_id, group_id, room_id, day, start_hour, duration):
+        """ Marque une plage occupée pour chacune des entités données (None : non concernée). """
+        mask = hours_mask(start_hour, duration)
+        for kind, entity_id in zip(KINDS, (instructor_id, group_id, room_id)):
+            if entity_id is not None:
+                busy = self.busy[kind]
+                busy[(entity_id, day)] = busy.get((entity_id, day), 0) | mask
+
+    def free(self, kind, entity_id, day):
+        """ Masque des heures libres d'une entité un jour donné. """
+        return FULL_DAY & ~self.busy[kind].get((entity_id, day), 0)
+
+    def find_slots(self, instructor_id=None, group_id=None, duration=2, min_capacity=0, requires_lab=False,
+                   days=tuple(database.DAYS), limit=10):
+        """
+        Créneaux où l'enseignant, le groupe et une salle d'au moins 'min_capacity' places sont libres.
+        Classement : d'abord les créneaux accolés aux séances existantes de l'enseignant et du groupe
+        (journées compactes), puis la salle la plus petite suffisante, puis le jour et l'heure.
+        Retourne au plus 'limit' dictionnaires (day, start_hour, duration, room_id, room_name, capacity).
+        """
+        rooms = [room for room in self.rooms if room[0] >= min_capacity and (room[3] or not requires_lab)]
+        entities = [(kind, entity_id) for kind, entity_id in (('instructor', instructor_id), ('group', group_id))
+                    if entity_id is not None]
+        window = (1 << duration) - 1
+        room_busy = self.busy['room']
+
+        candidates = []
+        for day in days:
+            free = FULL_DAY
+            for kind, entity_id in entities:
+                free &= self.free(kind, entity_id, day)
+            starts = window_starts(free, duration)
+            while starts:
+                offset = (starts & -starts).bit_length() - 1
+                starts &= starts - 1
+                # séances existantes juste avant ou juste après la plage
+                neighbours = (1 << offset >> 1) | (1 << (offset + duration))
+                touching = sum(1 for kind, entity_id in entities
+                               if self.busy[kind].get((entity_id, day), 0) & neighbours)
+                # plus petite salle suffisante libre sur toute la plage
+                for position, (capacity, room_id, room_name, lab) in enumerate(rooms):
+                    if not room_busy.get((room_id, day), 0) >> offset & window:
+                        candidates.append(((-touching, position, day, offset),
+                                           {'day': day, 'start_hour': FIRST_HOUR + offset, 'duration': duration,
+                                            'room_id': room_id, 'room_name': room_name, 'capacity': capacity}))
+                        break
+
+        candidates.sort(key=lambda candidate: candidate[0])
+        return [slot for rank, slot in candidates[:limit]]
+
+    def heatmap(self, kind, entity_ids, days=tuple(database.DAYS)):
+        """ Nombre d'entités libres à chaque heure : {jour: [libres à FIRST_HOUR, ..., libres à LAST_HOUR - 1]}. """
+        heatmap = {}
+        for day in days:
+            counts = [0] * (LAST_HOUR - FIRST_HOUR)
+            for entity_id in entity_ids:
+                free = self.free(kind, entity_id, day)
+                while free:
+                    counts[(free & -free).bit_length() - 1] += 1
+                    free &= free - 1
+            heatmap[day] = counts
+        return heatmap
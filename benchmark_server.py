@@ -0,0 +1,74 @@
+import http.client
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+# Paramètres par défaut : python benchmark_server.py [url] [clients] [secondes] [nombre de groupes]
+URL = "http://127.0.0.1:8000"
+CLIENTS = 8
+SECONDS = 10.0
+GROUPS = 5
+
+
+# Simulated student : reads random group weeks, revalidating weeks already seen with If-None-Match
+def client(url, groups, stop, results):
+    parsed = urlparse(url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=10)
+    etags = {}
+    statuses = {}
+    latencies = []
+    while not stop.is_set():
+        group_id = random.randint(1, groups)
+        headers = {"If-None-Match": etags[group_id]} if group_id in etags else {}
+        start = time.perf_counter()
+        try:
+            conn.request("GET", f"/timetable/group/{group_id}", headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            statuses['erreur'] = statuses.get('erreur', 0) + 1
+            conn.close()
+            continue
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+        if response.getheader("ETag"):
+            etags[group_id] = response.getheader("ETag")
+    conn.close()
+    results.append((statuses, latencies))
+
+
+def run(url=URL, clients=CLIENTS, seconds=SECONDS, groups=GROUPS):
+    stop = threading.Event()
+    results = []
+    threads = [threading.Thread(target=client, args=(url, groups, stop, results)) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    statuses = {}
+    latencies = []
+    for client_statuses, client_latencies in results:
+        for status, count in client_statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+        latencies.extend(client_latencies)
+    latencies.sort()
+    if not latencies:
+        print(f"Aucune réponse de {url} ({statuses})")
+        return
+    print(f"{len(latencies) / seconds:.0f} requêtes/s avec {clients} clients pendant {seconds:.0f} s, "
+          f"réponses : {statuses}")
+    print(f"latence médiane {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    run(arguments[0] if len(arguments) > 0 else URL,
+        int(arguments[1]) if len(arguments) > 1 else CLIENTS,
+        float(arguments[2]) if len(arguments) > 2 else SECONDS,
+        int(arguments[3]) if len(arguments) > 3 else GROUPS)
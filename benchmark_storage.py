@@ -0,0 +1,112 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import database
+
+# Taille de l'emploi du temps publié et durée de chaque mesure
+NUMBER_OF_SLOTS = 20000
+ENTITIES = 400
+READERS = 4
+SECONDS = 5.0
+
+# Semaine d'un groupe ; day IN (...) permet d'utiliser idx_timetable_group (day, group_id, ...), sans
+# parcours complet de timetable ni tri
+READ_QUERY = f"""
+    SELECT day, start_hour, duration, course_id, room_id FROM timetable
+    WHERE day IN ({", ".join(str(day) for day in database.DAYS)}) AND group_id = ?
+    ORDER BY day, start_hour
+"""
+
+
+# Builds a conflict-free full timetable : each entity has one hour per (day, hour) combination
+def make_slots():
+    slots = []
+    per_entity = NUMBER_OF_SLOTS // ENTITIES
+    for k in range(NUMBER_OF_SLOTS):
+        entity = k // per_entity + 1
+        slots.append((1, entity, entity, entity, k % 5 + 1, 8 + (k // 5) % 10, 1))
+    return slots
+
+
+# Creates referenced rows (instructors, groups, rooms, one subject) in the current database
+def populate_entities():
+    conn = database.getConnection()
+    with database.transaction():
+        conn.execute("INSERT INTO subjects (name, code, hours_total, type) VALUES ('Bench', 'BENCH', 30, 'CM')")
+        conn.executemany("INSERT INTO instructors (name, speciality) VALUES (?, 'Bench')",
+                         [(f"I{i}",) for i in range(ENTITIES)])
+        conn.executemany("INSERT INTO groups (name, student_count, filiere) VALUES (?, 20, 'Bench')",
+                         [(f"G{i}",) for i in range(ENTITIES)])
+        conn.executemany("INSERT INTO rooms (name, type, capacity) VALUES (?, 'Cours', 40)",
+                         [(f"R{i}",) for i in range(ENTITIES)])
+    conn.close()
+
+
+# Reads weekly timetables of groups until stop is set ; records count, errors and worst latency
+def reader(number, stop, results):
+    count = errors = 0
+    worst = 0.0
+    group_id = number % ENTITIES + 1
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            conn = database.getConnection()
+            try:
+                conn.execute(READ_QUERY, (group_id,)).fetchall()
+            finally:
+                conn.close()
+            count += 1
+        except database.sqlite3.OperationalError:
+            errors += 1
+        worst = max(worst, time.perf_counter() - start)
+        group_id = group_id % ENTITIES + 1
+    results.append((count, errors, worst))
+
+
+# Publishes the full timetable again and again until stop is set
+def writer(slots, stop, publishes):
+    while not stop.is_set():
+        if database.replace_semester_timetable("BENCH", slots):
+            publishes.append(1)
+
+
+# Measures concurrent read throughput during publications with one storage profile
+def run(profile, directory):
+    database.DB_NAME = os.path.join(directory, f"bench_{profile}.db")
+    database.CONNECTION_PRAGMAS = dict(database.STORAGE_PROFILES[profile])
+    database.close_connections()
+    database.setup()
+    populate_entities()
+    slots = make_slots()
+    database.replace_semester_timetable("BENCH", slots)
+
+    stop = threading.Event()
+    results = []
+    publishes = []
+    threads = [threading.Thread(target=reader, args=(i, stop, results)) for i in range(READERS)]
+    threads.append(threading.Thread(target=writer, args=(slots, stop, publishes)))
+    for thread in threads:
+        thread.start()
+    time.sleep(SECONDS)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    database.close_connections()
+
+    reads = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    worst = max(r[2] for r in results)
+    print(f"{profile:8s} : {reads / SECONDS:8.0f} lectures/s, {errors} erreur(s), "
+          f"latence max {worst * 1000:7.1f} ms, {len(publishes)} publication(s) de {NUMBER_OF_SLOTS} créneaux")
+
+
+if __name__ == "__main__":
+    profiles = sys.argv[1:] or ['journal', 'wal']
+    print(f"{READERS} lecteurs pendant la publication répétée d'un emploi du temps ({SECONDS:.0f} s par profil)")
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in profiles:
+            run(profile, directory)
+        print(f"Plan de la lecture : {'; '.join(database.explain_query_plan(READ_QUERY, (1,)))}")
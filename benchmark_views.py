@@ -0,0 +1,75 @@
+import os
+import random
+import tempfile
+import time
+
+import benchmark_storage
+import database
+
+# Nombre de semaines lues pour chaque mesure
+READS = 2000
+
+# Requête de la semaine d'un groupe avant la vue matérialisée : jointure sur les cinq tables, avec le
+# même filtre de semestre que la vue ; day IN (...) permet d'utiliser idx_timetable_group (day, group_id, ...),
+# le seul index de timetable sur le groupe
+JOIN_QUERY = f"""
+    SELECT t.day, t.start_hour, t.duration, t.semester, s.name AS subject_name, i.name AS instructor_name,
+           g.name AS group_name, r.name AS room_name, t.created_at, t.updated_at
+    FROM timetable t
+    JOIN subjects s ON t.course_id = s.id
+    JOIN instructors i ON t.instructor_id = i.id
+    JOIN groups g ON t.group_id = g.id
+    JOIN rooms r ON t.room_id = r.id
+    WHERE t.day IN ({", ".join(str(day) for day in database.DAYS)}) AND t.group_id = ?
+    AND (t.semester IS NULL OR t.semester = ?)
+    ORDER BY t.day, t.start_hour
+"""
+
+
+# Reads weekly timetables of random groups ; returns latencies in milliseconds
+def measure(read):
+    latencies = []
+    for _ in range(READS):
+        group_id = random.randint(1, benchmark_storage.ENTITIES)
+        start = time.perf_counter()
+        read(group_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return latencies
+
+
+# Prints mean, median and 99th percentile of latencies
+def report(name, latencies):
+    mean = sum(latencies) / len(latencies)
+    print(f"{name:24s} : moyenne {mean:7.3f} ms, médiane {latencies[len(latencies) // 2]:7.3f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)]:7.3f} ms")
+
+
+def read_with_join(group_id):
+    conn = database.getConnection()
+    conn.execute(JOIN_QUERY, (group_id, "BENCH")).fetchall()
+    conn.close()
+
+
+def read_from_view(group_id):
+    database.get_weekly_timetable('group', group_id, "BENCH")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        database.DB_NAME = os.path.join(directory, "bench_views.db")
+        database.setup()
+        benchmark_storage.populate_entities()
+        start = time.perf_counter()
+        database.replace_semester_timetable("BENCH", benchmark_storage.make_slots())
+        print(f"Publication de {benchmark_storage.NUMBER_OF_SLOTS} créneaux (vue tenue à jour par triggers) : "
+              f"{time.perf_counter() - start:.2f} s")
+        start = time.perf_counter()
+        database.refresh_timetable_views()
+        print(f"Reconstruction complète de la vue : {time.perf_counter() - start:.2f} s")
+
+        print(f"Plan de la jointure : {'; '.join(database.explain_query_plan(JOIN_QUERY, (1, 'BENCH')))}")
+        print(f"Lecture de {READS} semaines de groupes ({benchmark_storage.NUMBER_OF_SLOTS} créneaux en base)")
+        report("avant (jointure)", measure(read_with_join))
+        report("après (vue matérialisée)", measure(read_from_view))
+        database.close_connections()
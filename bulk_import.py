@@ -0,0 +1,205 @@
+import csv
+import json
+import os
+import sys
+import time
+
+import database
+
+# Nombre de lignes envoyées à chaque executemany (la transaction couvre toute la table)
+BATCH_SIZE = 5000
+
+# Colonne identifiant une ligne par son nom, pour les tables référencées par d'autres
+NAME_COLUMNS = {
+    'users': 'username',
+    'instructors': 'name',
+    'rooms': 'name',
+    'subjects': 'code',
+    'groups': 'name',
+}
+
+# Tables importées, dans l'ordre des dépendances :
+# (table, colonnes insérées, {colonne: (champ du fichier, table référencée, obligatoire)})
+IMPORT_SPECS = [
+    ('users', ('username', 'password', 'role', 'full_name'), {}),
+    ('instructors', ('user_id', 'name', 'speciality', 'unavailable_slots', 'active'),
+     {'user_id': ('username', 'users', False)}),
+    ('rooms', ('name', 'type', 'capacity', 'equipments', 'active'), {}),
+    ('subjects', ('name', 'code', 'hours_total', 'type', 'required_equipment'), {}),
+    ('groups', ('name', 'student_count', 'filiere', 'active'), {}),
+    ('subject_groups', ('subject_id', 'group_id'),
+     {'subject_id': ('subject_code', 'subjects', True), 'group_id': ('group_name', 'groups', True)}),
+    ('subject_instructors', ('subject_id', 'instructor_id'),
+     {'subject_id': ('subject_code', 'subjects', True), 'instructor_id': ('instructor_name', 'instructors', True)}),
+]
+
+# Valeurs par défaut des champs absents du fichier (mêmes défauts que les fonctions insert_*)
+DEFAULTS = {
+    'unavailable_slots': "",
+    'equipments': "",
+    'required_equipment': "",
+    'active': 1,
+}
+
+
+def read_records(path):
+    """ Lit un fichier CSV (avec en-tête), JSON (liste d'objets) ou JSON Lines, ligne par ligne. """
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
+    elif path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, encoding='utf-8') as f:
+            yield from json.load(f)
+
+
+def load_name_map(table):
+    """ Dictionnaire nom -> id d'une table, en une requête (premier id en cas de doublon). """
+    conn = database.getConnection()
+    try:
+        names = {}
+        for name, id in conn.execute(f"SELECT {NAME_COLUMNS[table]}, id FROM {table} ORDER BY id"):
+            names.setdefault(name, id)
+        return names
+    finally:
+        conn.close()
+
+
+def _make_row(table, columns, references, record, maps):
+    # Retourne le tuple à insérer, ou None si une référence obligatoire est introuvable
+    row = []
+    for column in columns:
+        if column in references:
+            field, referenced, required = references[column]
+            name = record.get(field)
+            value = maps[referenced].get(name) if name not in (None, "") else None
+            if value is None and (required or name not in (None, "")):
+                return None
+        else:
+            value = record.get(column)
+            if value in (None, "") and column in DEFAULTS:
+                value = DEFAULTS[column]
+        row.append(value)
+    return tuple(row)
+
+
+def _valid_rows(table, columns, references, records, maps, counts):
+    # Lignes à insérer ; counts['read'] compte les enregistrements lus et counts['rejected'] liste les
+    # utilisateurs sans mot de passe (qui ne doivent pas recevoir le haché de "None" ou de "")
+    position = columns.index('password') if table == 'users' else None
+    for record in records:
+        counts['read'] += 1
+        row = _make_row(table, columns, references, record, maps)
+        if row is None:
+            continue
+        if position is not None and row[position] in (None, ""):
+            counts['rejected'].append(record.get('username'))
+            continue
+        yield row
+
+
+def _hash_passwords(columns, rows):
+    # Mots de passe en clair des utilisateurs : tous hachés en parallèle avant l'ouverture de la transaction
+    position = columns.index('password')
+    hashes = database.hash_passwords([str(row[position]) for row in rows])
+    return [row[:position] + (password_hash,) + row[position + 1:] for row, password_hash in zip(rows, hashes)]
+
+
+def import_rows(table, records, maps=None):
+    """
+    Importe des enregistrements (dictionnaires) dans une table, en une seule transaction.
+    Les références sont résolues par nom via 'maps' (table -> {nom: id}), complété au besoin.
+    Comme les fonctions insert_*, les lignes en doublon ou invalides sont ignorées ; les utilisateurs
+    sans mot de passe sont rejetés et signalés. Les mots de passe sont hachés avant la transaction,
+    qui ne tient donc pas le verrou d'écriture pendant bcrypt.
+    Retourne un rapport {table, rows, inserted, skipped, rejected, seconds}.
+    """
+    columns, references = next((c, r) for t, c, r in IMPORT_SPECS if t == table)
+    maps = {} if maps is None else maps
+    for field, referenced, required in references.values():
+        if referenced not in maps:
+            maps[referenced] = load_name_map(referenced)
+
+    query = f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    start = time.perf_counter()
+    counts = {'read': 0, 'rejected': []}
+    rows = _valid_rows(table, columns, references, records, maps, counts)
+    if table == 'users':
+        rows = iter(_hash_passwords(columns, list(rows)))
+
+    conn = database.getConnection()
+    changes = conn.total_changes
+    try:
+        # ids AUTOINCREMENT : les enseignants importés ont un id supérieur au plus grand id actuel
+        if table == 'instructors':
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM instructors").fetchone()[0]
+        with database.transaction():
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= BATCH_SIZE:
+                    conn.executemany(query, batch)
+                    batch.clear()
+            if batch:
+                conn.executemany(query, batch)
+        inserted = conn.total_changes - changes
+    finally:
+        conn.close()
+    seconds = time.perf_counter() - start
+    read = counts['read']
+    rejected = counts['rejected']
+
+    database.invalidate_id_cache(table)
+    # la table importée peut être référencée par les suivantes
+    if table in NAME_COLUMNS:
+        maps[table] = load_name_map(table)
+    # indisponibilités des enseignants importés : lignes de teacher_unavailability vérifiées par check_conflict
+    if table == 'instructors':
+        conn = database.getConnection()
+        try:
+            imported_ids = [id for (id,) in conn.execute("SELECT id FROM instructors WHERE id > ?", (last_id,))]
+        finally:
+            conn.close()
+        database.sync_unavailable_slots(imported_ids)
+
+    if rejected:
+        print(f"{table} : {len(rejected)} utilisateur(s) rejeté(s) sans mot de passe : "
+              f"{', '.join(str(username) for username in rejected[:10])}{' ...' if len(rejected) > 10 else ''}")
+    rate = inserted / seconds if seconds > 0 else 0.0
+    print(f"{table} : {inserted} ligne(s) insérée(s), {read - inserted} ignorée(s), "
+          f"en {seconds:.2f} s ({rate:.0f} lignes/s)")
+    return {'table': table, 'rows': read, 'inserted': inserted, 'skipped': read - inserted, 'rejected': rejected,
+            'seconds': seconds}
+
+
+def import_directory(path):
+    """
+    Importe les fichiers <table>.csv, <table>.json ou <table>.jsonl d'un dossier,
+    table par table dans l'ordre des dépendances. Retourne la liste des rapports.
+    """
+    maps = {}
+    reports = []
+    for table, columns, references in IMPORT_SPECS:
+        for extension in ('.csv', '.json', '.jsonl'):
+            filename = os.path.join(path, table + extension)
+            if os.path.exists(filename):
+                reports.append(import_rows(table, read_records(filename), maps))
+                break
+
+    inserted = sum(report['inserted'] for report in reports)
+    seconds = sum(report['seconds'] for report in reports)
+    rate = inserted / seconds if seconds > 0 else 0.0
+    print(f"Import terminé : {inserted} ligne(s) en {seconds:.2f} s ({rate:.0f} lignes/s)")
+    return reports
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage : python bulk_import.py <dossier des fichiers à importer>")
+        sys.exit(1)
+    database.setup()
+    import_directory(sys.argv[1])
@@ -0,0 +1,74 @@
+import threading
+from bisect import bisect_left
+
+# Ordre de vérification des entités, identique à celui des branches UNION ALL de check_conflict
+ENTITY_KINDS = ('Enseignant', 'Groupe', 'Salle')
+
+
+class ConflictIndex:
+    """
+    Index en mémoire des intervalles occupés de timetable, par (entité, jour).
+    Répond à check_conflict sans requête SQL (les indisponibilités des enseignants sont vérifiées
+    à part, avec les masques de database.get_unavailability_masks).
+    """
+
+    def __init__(self):
+        # (type, entity_id, jour) -> [débuts triés, fins, maximum courant des fins]
+        # Un intervalle chevauche [début, fin) s'il commence avant 'fin' et que la plus grande fin
+        # des intervalles commençant avant 'fin' dépasse 'début' : une bisection suffit
+        self.intervals = {}
+        # Index à reconstruire (ex. après l'annulation d'une transaction)
+        self.stale = False
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_connection(cls, conn, semester=None, replacing=False):
+        """
+        Construit l'index à partir du contenu de la base.
+        semester : seulement les créneaux de ce semestre et ceux sans semestre (None : tous les créneaux).
+        replacing : sans les créneaux du semestre, sur le point d'être remplacés (seulement ceux sans semestre).
+        """
+        index = cls()
+        for row in conn.execute("""
+            SELECT instructor_id, group_id, room_id, day, start_hour, duration FROM timetable
+            WHERE ? IS NULL OR semester IS NULL OR (semester = ? AND NOT ?)
+        """, (semester, semester, replacing)):
+            index.add_slot(*row)
+        return index
+
+    def add(self, kind, entity_id, day, start_hour, duration):
+        with self.lock:
+            starts, ends, max_ends = self.intervals.setdefault((kind, entity_id, day), ([], [], []))
+            position = bisect_left(starts, start_hour)
+            starts.insert(position, start_hour)
+            ends.insert(position, start_hour + duration)
+            # mise à jour du maximum courant à partir de la position d'insertion
+            max_ends.insert(position, 0)
+            current = max_ends[position - 1] if position else ends[position]
+            for i in range(position, len(ends)):
+                current = max(current, ends[i])
+                max_ends[i] = current
+
+    def add_slot(self, instructor_id, group_id, room_id, day, start_hour, duration):
+        # une entité absente (ex. réservation sans salle ou sans groupe) n'occupe rien
+        for kind, entity_id in zip(ENTITY_KINDS, (instructor_id, group_id, room_id)):
+            if entity_id is not None:
+                self.add(kind, entity_id, day, start_hour, duration)
+
+    def overlaps(self, kind, entity_id, day, start_hour, end_hour):
+        """ True si un intervalle de l'entité chevauche [start_hour, end_hour) ce jour-là. """
+        with self.lock:
+            entry = self.intervals.get((kind, entity_id, day))
+            if entry is None:
+                return False
+            starts, ends, max_ends = entry
+            position = bisect_left(starts, end_hour)
+            return position > 0 and max_ends[position - 1] > start_hour
+
+    def check(self, instructor_id, group_id, room_id, day, start_hour, duration):
+        """ Conflit avec un créneau existant : même message que database.check_conflict, ou None. """
+        end_hour = start_hour + duration
+        for kind, entity_id in zip(ENTITY_KINDS, (instructor_id, group_id, room_id)):
+            if self.overlaps(kind, entity_id, day, start_hour, end_hour):
+                return f"Conflit d'horaire existant pour l'entité : {kind} (ID: {entity_id})."
+        return None
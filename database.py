@@ -1,20 +1,110 @@
 import sqlite3
 import bcrypt
+import hashlib
 import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from conflict_index import ConflictIndex
 
 # Nom du fichier de la base de données
 DB_NAME = 'university_schedule.db'
 
 # Constante pour les jours de la semaine (pour l'affichage)
 DAYS = {1: "Lundi", 2: "Mardi", 3: "Mercredi", 4: "Jeudi", 5: "Vendredi"}
+DAY_NUMBERS = {name.lower(): number for number, name in DAYS.items()}
+
+# Motif des lignes de teacher_unavailability issues de la colonne instructors.unavailable_slots
+UNAVAILABLE_SLOTS_REASON = "unavailable_slots"
+
+# Masque hebdomadaire d'indisponibilité d'un enseignant : bit (jour - 1) * MASK_DAY_BITS + heure
+MASK_DAY_BITS = 24
+
+# Profils de stockage : PRAGMAs appliqués une seule fois à chaque nouvelle connexion du pool
+STORAGE_PROFILES = {
+    # Journal WAL : les lectures continuent pendant l'écriture (ex. publication d'un emploi du temps)
+    'wal': {
+        'foreign_keys': 'ON',
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',     # sûr en WAL : seule la dernière transaction peut être perdue sur coupure
+        'cache_size': -20000,        # 20 Mo de cache de pages par connexion
+        'mmap_size': 268435456,      # lecture de la base par projection mémoire (256 Mo)
+        'busy_timeout': 5000,        # ms d'attente d'un verrou avant l'erreur "database is locked"
+    },
+    # Journal de rollback classique : une écriture bloque toutes les lectures
+    'journal': {
+        'foreign_keys': 'ON',
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+    },
+}
+
+# PRAGMAs des nouvelles connexions (changer de profil puis appeler close_connections())
+CONNECTION_PRAGMAS = dict(STORAGE_PROFILES['wal'])
+
+# Index secondaires créés par setup() (voir check_query_plans pour les requêtes qu'ils servent)
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_timetable_instructor ON timetable(day, instructor_id, start_hour, duration)",
+    "CREATE INDEX IF NOT EXISTS idx_timetable_group ON timetable(day, group_id, start_hour, duration)",
+    "CREATE INDEX IF NOT EXISTS idx_timetable_room ON timetable(day, room_id, start_hour, duration)",
+    "CREATE INDEX IF NOT EXISTS idx_timetable_semester ON timetable(semester)",
+    "CREATE INDEX IF NOT EXISTS idx_timetable_updated_at ON timetable(updated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_unavailability_instructor ON teacher_unavailability(instructor_id, day, start_hour, duration)",
+    "CREATE INDEX IF NOT EXISTS idx_instructors_name ON instructors(name)",
+    "CREATE INDEX IF NOT EXISTS idx_change_log_table ON change_log(table_name, seq)",
+    "CREATE INDEX IF NOT EXISTS idx_timetable_view_group ON timetable_view(group_id, day, start_hour)",
+    "CREATE INDEX IF NOT EXISTS idx_timetable_view_instructor ON timetable_view(instructor_id, day, start_hour)",
+    "CREATE INDEX IF NOT EXISTS idx_timetable_view_room ON timetable_view(room_id, day, start_hour)",
+]
+
+# Colonnes de la vue matérialisée timetable_view (une ligne par créneau, noms déjà joints)
+TIMETABLE_VIEW_COLUMNS = """
+    timetable_id, day, start_hour, duration, semester, course_id, subject_name,
+    instructor_id, instructor_name, group_id, group_name, room_id, room_name, created_at, updated_at
+"""
+
+# Lignes de la vue, calculées depuis timetable (même jointure que le rapport de main())
+TIMETABLE_VIEW_SELECT = """
+    SELECT t.id, t.day, t.start_hour, t.duration, t.semester, t.course_id, s.name,
+           t.instructor_id, i.name, t.group_id, g.name, t.room_id, r.name, t.created_at, t.updated_at
+    FROM timetable t
+    JOIN subjects s ON t.course_id = s.id
+    JOIN instructors i ON t.instructor_id = i.id
+    JOIN groups g ON t.group_id = g.id
+    JOIN rooms r ON t.room_id = r.id
+"""
+
+# Tables suivies par le journal des modifications : table -> colonnes (enseignant, groupe, salle)
+# d'une ligne (NULL : non concernée)
+CHANGE_LOG_TABLES = {
+    'timetable': ('instructor_id', 'group_id', 'room_id'),
+    'reservations': ('instructor_id', 'group_id', 'room_id'),
+    'teacher_unavailability': ('instructor_id', 'NULL', 'NULL'),
+}
+
+# Facteur de coût bcrypt des mots de passe (2^BCRYPT_ROUNDS itérations) : chaque incrément double
+# le temps de hachage, donc la durée d'un provisionnement en masse comme celle d'une attaque
+BCRYPT_ROUNDS = 12
+
+# Nombre d'utilisateurs hachés puis insérés à chaque étape de insert_users
+USER_BATCH_SIZE = 500
+
+# Durée de validité d'une session ouverte par login()
+SESSION_HOURS = 8
 
 # --- 1. FONCTIONS DE BASE ET SETUP ---
 
 def setup():
-    conn = sqlite3.connect(DB_NAME)
+    conn = getConnection()
     cursor = conn.cursor()
 
-    # Activer les clés étrangères
+    # Activer les clés étrangères (déjà fait par défaut via CONNECTION_PRAGMAS)
     cursor.execute("PRAGMA foreign_keys = ON;")
 
     # ------------------ TABLE UTILISATEURS ------------------
@@ -97,6 +187,7 @@ def setup():
             day INTEGER NOT NULL,
             start_hour INTEGER NOT NULL,
             duration INTEGER NOT NULL,
+            semester TEXT,
             created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
             updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
             created_by INTEGER,
@@ -108,6 +199,11 @@ def setup():
         );
     """)
 
+    # Migration : colonne 'semester' ajoutée aux bases créées avant son introduction
+    cursor.execute("PRAGMA table_info(timetable)")
+    if 'semester' not in [column[1] for column in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE timetable ADD COLUMN semester TEXT")
+
     # ------------------ TABLE INDISPONIBILITÉS ENSEIGNANTS ------------------
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS teacher_unavailability (
@@ -172,6 +268,19 @@ def setup():
         );
     """)
 
+    # ------------------ TABLE SESSIONS ------------------
+    # Seule l'empreinte SHA-256 du jeton est stockée : une copie de la base ne donne pas de session valide
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            token_hash TEXT NOT NULL UNIQUE,
+            user_id INTEGER NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            expires_at DATETIME NOT NULL,
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        );
+    """)
+
     # ------------------ TRIGGERS POUR updated_at ------------------
     cursor.execute("""
         CREATE TRIGGER IF NOT EXISTS update_users_timestamp 
@@ -245,12 +354,128 @@ def setup():
         END;
     """)
 
+    # ------------------ VUE MATÉRIALISÉE DES EMPLOIS DU TEMPS ------------------
+    # Emploi du temps dénormalisé, tenu à jour par triggers quel que soit l'auteur de l'écriture :
+    # la semaine d'un groupe, d'un enseignant ou d'une salle se lit sans jointure
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS timetable_view (
+            timetable_id INTEGER PRIMARY KEY,
+            day INTEGER NOT NULL,
+            start_hour INTEGER NOT NULL,
+            duration INTEGER NOT NULL,
+            semester TEXT,
+            course_id INTEGER NOT NULL,
+            subject_name TEXT,
+            instructor_id INTEGER NOT NULL,
+            instructor_name TEXT,
+            group_id INTEGER NOT NULL,
+            group_name TEXT,
+            room_id INTEGER NOT NULL,
+            room_name TEXT,
+            created_at DATETIME,
+            updated_at DATETIME
+        );
+    """)
+
+    for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW")):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS timetable_view_{event.lower()}
+            AFTER {event} ON timetable
+            FOR EACH ROW
+            BEGIN
+                INSERT OR REPLACE INTO timetable_view ({TIMETABLE_VIEW_COLUMNS})
+                {TIMETABLE_VIEW_SELECT} WHERE t.id = {row}.id;
+            END;
+        """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS timetable_view_delete
+        AFTER DELETE ON timetable
+        FOR EACH ROW
+        BEGIN
+            DELETE FROM timetable_view WHERE timetable_id = OLD.id;
+        END;
+    """)
+
+    # Renommage d'une matière, d'un enseignant, d'un groupe ou d'une salle
+    for table, id_column, name_column in (("subjects", "course_id", "subject_name"),
+                                          ("instructors", "instructor_id", "instructor_name"),
+                                          ("groups", "group_id", "group_name"),
+                                          ("rooms", "room_id", "room_name")):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS timetable_view_{table}_name
+            AFTER UPDATE OF name ON {table}
+            FOR EACH ROW
+            BEGIN
+                UPDATE timetable_view SET {name_column} = NEW.name WHERE {id_column} = NEW.id;
+            END;
+        """)
+
+    # ------------------ JOURNAL DES MODIFICATIONS ------------------
+    # Une ligne par insertion, modification ou suppression dans CHANGE_LOG_TABLES, numérotée par seq
+    # (AUTOINCREMENT : croissant, jamais réutilisé). Les entités avant (old_*) et après la modification
+    # permettent aux caches d'invalider seulement les emplois du temps concernés (voir changes_since)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            operation TEXT NOT NULL CHECK (operation IN ('INSERT', 'UPDATE', 'DELETE')),
+            instructor_id INTEGER,
+            group_id INTEGER,
+            room_id INTEGER,
+            old_instructor_id INTEGER,
+            old_group_id INTEGER,
+            old_room_id INTEGER,
+            changed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+    for table, columns in CHANGE_LOG_TABLES.items():
+        # UPDATE OF toutes les colonnes sauf updated_at : la mise à jour de l'horodatage par trigger
+        # n'est pas journalisée une seconde fois
+        cursor.execute(f"PRAGMA table_info({table})")
+        updatable = ", ".join(column[1] for column in cursor.fetchall() if column[1] not in ('id', 'updated_at'))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            row = "OLD" if event == "DELETE" else "NEW"
+            entities = ", ".join(f"{row}.{column}" if column != 'NULL' else 'NULL' for column in columns)
+            old_entities = ", ".join(f"OLD.{column}" if event == "UPDATE" and column != 'NULL' else 'NULL'
+                                     for column in columns)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS change_log_{table}_{event.lower()}
+                AFTER {event if event != "UPDATE" else f"UPDATE OF {updatable}"} ON {table}
+                FOR EACH ROW
+                BEGIN
+                    INSERT INTO change_log (table_name, row_id, operation, instructor_id, group_id, room_id,
+                                            old_instructor_id, old_group_id, old_room_id)
+                    VALUES ('{table}', {row}.id, '{event}', {entities}, {old_entities});
+                END;
+            """)
+
+    # ------------------ INDEX ------------------
+    # Index composites couvrant les requêtes de check_conflict : égalité sur (jour, entité),
+    # puis start_hour/duration lus directement dans l'index, sans accès à la table
+    for statement in INDEXES:
+        cursor.execute(statement)
+
+    # ------------------ MIGRATION DE LA VUE MATÉRIALISÉE ------------------
+    # Base créée avant la vue : remplissage initial
+    cursor.execute("SELECT (SELECT COUNT(*) FROM timetable) != (SELECT COUNT(*) FROM timetable_view)")
+    if cursor.fetchone()[0]:
+        refresh_timetable_views()
+
+    # ------------------ CONSERVATION DU JOURNAL DES MODIFICATIONS ------------------
+    prune_changes()
+
+    # ------------------ MIGRATION DES INDISPONIBILITÉS ------------------
+    # La colonne texte instructors.unavailable_slots est convertie en lignes de teacher_unavailability
+    sync_unavailable_slots()
 
     # ------------------ ADMIN PAR DÉFAUT ------------------
     cursor.execute("SELECT count(*) FROM users WHERE role='admin'")
     if cursor.fetchone()[0] == 0:
         print("Création de l'administrateur par défaut...")
-        password_hash = bcrypt.hashpw("admin123".encode('utf-8'), bcrypt.gensalt())
+        password_hash = hash_password("admin123")
         cursor.execute("""
             INSERT INTO users (username, password, role, full_name)
             VALUES (?, ?, ?, ?)
@@ -260,36 +485,267 @@ def setup():
     conn.close()
     print("Base de données initialisée avec succès (avec timestamps).")
 
+# --- POOL DE CONNEXIONS ---
+
+class PooledConnection(sqlite3.Connection):
+    """ Connexion réutilisée par un thread : close() la rend au pool au lieu de la fermer. """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Profondeur des blocs transaction() en cours sur cette connexion
+        self.transaction_depth = 0
+        # Une entrée par getConnection() non encore rendu : True si une transaction était déjà ouverte
+        # (elle appartient alors à l'appelant précédent et close() ne doit pas l'annuler)
+        self.checkouts = []
+
+    def commit(self):
+        # Dans un bloc transaction(), la validation a lieu à la sortie du bloc
+        if self.transaction_depth == 0:
+            super().commit()
+
+    def rollback(self):
+        if self.transaction_depth == 0:
+            super().rollback()
+
+    def close(self):
+        # Une transaction laissée ouverte (ex. après une IntegrityError) est annulée, comme le faisait
+        # la fermeture réelle de la connexion, mais seulement si elle a été ouverte depuis le getConnection()
+        # correspondant : celle d'un appelant (ex. INSERT puis get_id_by_name puis commit) est conservée
+        inherited = self.checkouts.pop() if self.checkouts else False
+        if self.transaction_depth == 0 and self.in_transaction and not inherited:
+            super().rollback()
+
+    def dispose(self):
+        """ Ferme réellement la connexion. """
+        super().close()
+
+# Connexion de chaque thread, et registre de toutes les connexions ouvertes
+_local = threading.local()
+_pool_lock = threading.Lock()
+_pool = []
+# Incrémenté par close_connections() : les connexions des autres threads, fermées, sont alors rouvertes
+_pool_generation = 0
+
 def getConnection():
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row 
+    conn = getattr(_local, 'connection', None)
+    if conn is not None and _local.db_name == DB_NAME and _local.generation == _pool_generation:
+        conn.checkouts.append(conn.in_transaction)
+        return conn
+
+    if conn is not None:
+        # DB_NAME a changé ou le pool a été fermé : l'ancienne connexion n'est plus utilisable
+        _discard_connection(conn)
+
+    # check_same_thread=False uniquement pour permettre close_connections() depuis un autre thread
+    conn = sqlite3.connect(DB_NAME, factory=PooledConnection, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    for pragma, value in CONNECTION_PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+
+    _local.connection = conn
+    _local.db_name = DB_NAME
+    _local.generation = _pool_generation
+    with _pool_lock:
+        _pool.append(conn)
+    conn.checkouts.append(False)
     return conn
 
+def _discard_connection(conn):
+    with _pool_lock:
+        if conn in _pool:
+            _pool.remove(conn)
+    conn.dispose()
+
+def close_connections():
+    """
+    Ferme toutes les connexions du pool (ex. avant de supprimer le fichier de la base).
+    Chaque thread obtient une nouvelle connexion à son prochain getConnection().
+    """
+    global _pool_generation
+    with _pool_lock:
+        connections = list(_pool)
+        _pool.clear()
+        _pool_generation += 1
+    for conn in connections:
+        conn.dispose()
+    _local.__dict__.clear()
+    invalidate_id_cache()
+    invalidate_unavailability_masks()
+
+@contextmanager
+def transaction():
+    """
+    Exécute plusieurs helpers dans une seule transaction :
+        with transaction():
+            insert_room(...)
+            insert_group(...)
+    Les commit() des helpers sont différés jusqu'à la sortie du bloc ; une exception annule
+    tout le bloc. Un helper qui échoue renvoie son résultat habituel (None/False) sans annuler
+    le bloc : lever une exception pour tout annuler.
+    """
+    conn = getConnection()
+    try:
+        if conn.transaction_depth == 0 and not conn.in_transaction:
+            conn.execute("BEGIN")
+        conn.transaction_depth += 1
+        try:
+            yield conn
+        except BaseException:
+            conn.transaction_depth -= 1
+            if conn.transaction_depth == 0:
+                conn.rollback()
+                # les créneaux ajoutés à l'index et les ids lus pendant le bloc viennent d'être annulés
+                invalidate_conflict_index()
+                invalidate_id_cache()
+                invalidate_unavailability_masks()
+            raise
+        conn.transaction_depth -= 1
+        if conn.transaction_depth == 0:
+            conn.commit()
+    finally:
+        # rend la connexion obtenue par getConnection() (la transaction est déjà validée ou annulée)
+        conn.close()
+
 # --- 2. FONCTIONS UTILITAIRES DE RÉCUPÉRATION D'ID ---
 
+# Cache LRU (base, table, colonne, nom) -> id des recherches par nom. Seuls les noms trouvés sont mis
+# en cache ; les fonctions d'écriture du module vident les entrées de la table modifiée.
+# Après une modification faite hors de ces fonctions, appeler invalidate_id_cache(table).
+ID_CACHE_SIZE = 4096
+_id_cache = OrderedDict()
+_id_cache_lock = threading.Lock()
+
+# Nombre maximal de noms par requête IN (...) de resolve_ids
+RESOLVE_CHUNK_SIZE = 500
+
+def _cached_id(key):
+    with _id_cache_lock:
+        id = _id_cache.get(key)
+        if id is not None:
+            _id_cache.move_to_end(key)
+        return id
+
+def _cache_id(key, id):
+    with _id_cache_lock:
+        _id_cache[key] = id
+        _id_cache.move_to_end(key)
+        while len(_id_cache) > ID_CACHE_SIZE:
+            _id_cache.popitem(last=False)
+
+def invalidate_id_cache(table=None):
+    """ Vide le cache des ids d'une table (de toutes les tables si table est None). """
+    with _id_cache_lock:
+        if table is None:
+            _id_cache.clear()
+        else:
+            for key in [key for key in _id_cache if key[1] == table]:
+                del _id_cache[key]
+
 def get_user_id_by_username(username):
-    conn = getConnection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
-    result = cursor.fetchone()
-    conn.close()
-    return result['id'] if result else None
+    return get_id_by_name("users", "username", username)
 
 def get_id_by_name(table, name_col, name_value):
+    key = (DB_NAME, table, name_col, name_value)
+    id = _cached_id(key)
+    if id is not None:
+        return id
+
     conn = getConnection()
     cursor = conn.cursor()
     cursor.execute(f"SELECT id FROM {table} WHERE {name_col} = ?", (name_value,))
     result = cursor.fetchone()
     conn.close()
+    if result:
+        _cache_id(key, result['id'])
     return result['id'] if result else None
 
+def resolve_ids(table, name_col, names):
+    """
+    Résout plusieurs noms en une requête IN (...) par paquet de RESOLVE_CHUNK_SIZE noms.
+    Retourne un dictionnaire {nom: id} (les noms introuvables en sont absents).
+    """
+    ids = {}
+    missing = []
+    for name in dict.fromkeys(names):
+        id = _cached_id((DB_NAME, table, name_col, name))
+        if id is not None:
+            ids[name] = id
+        else:
+            missing.append(name)
+
+    if missing:
+        conn = getConnection()
+        try:
+            for i in range(0, len(missing), RESOLVE_CHUNK_SIZE):
+                chunk = missing[i:i + RESOLVE_CHUNK_SIZE]
+                # premier id en cas de doublon, comme get_id_by_name
+                for row in conn.execute(f"""
+                    SELECT {name_col} AS name, id FROM {table}
+                    WHERE {name_col} IN ({", ".join("?" * len(chunk))}) ORDER BY id DESC
+                """, chunk):
+                    ids[row['name']] = row['id']
+        finally:
+            conn.close()
+        for name in missing:
+            if name in ids:
+                _cache_id((DB_NAME, table, name_col, name), ids[name])
+    return ids
+
 # --- 3. FONCTIONS D'INSERTION SPÉCIFIQUES ---
 
 # --- USERS ---
+def hash_password(password, rounds=None):
+    """ Hache un mot de passe avec bcrypt (coût BCRYPT_ROUNDS par défaut). """
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds or BCRYPT_ROUNDS))
+
+def hash_passwords(passwords, rounds=None, workers=None):
+    """
+    Hache une liste de mots de passe sur un pool de threads (bcrypt libère le GIL pendant le calcul).
+    Retourne les hachages dans l'ordre des mots de passe.
+    """
+    passwords = list(passwords)
+    if len(passwords) < 2:
+        return [hash_password(password, rounds) for password in passwords]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        return list(executor.map(lambda password: hash_password(password, rounds), passwords))
+
+def insert_users(users, rounds=None, workers=None):
+    """
+    Crée des comptes en masse. users : tuples (username, password, role, full_name).
+    Les mots de passe de chaque paquet de USER_BATCH_SIZE comptes sont hachés en parallèle,
+    hors transaction, puis le paquet est inséré avec executemany en une transaction.
+    Comme insert_user, les comptes en doublon ou invalides sont ignorés.
+    Retourne le nombre de comptes créés.
+    """
+    users = list(users)
+    created = 0
+    start = time.perf_counter()
+    for i in range(0, len(users), USER_BATCH_SIZE):
+        batch = users[i:i + USER_BATCH_SIZE]
+        hashes = hash_passwords([user[1] for user in batch], rounds, workers)
+        conn = getConnection()
+        try:
+            changes = conn.total_changes
+            with transaction():
+                conn.executemany("""
+                    INSERT OR IGNORE INTO users (username, password, role, full_name)
+                    VALUES (?, ?, ?, ?)
+                """, [(user[0], password_hash, user[2], user[3] if len(user) > 3 else None)
+                      for user, password_hash in zip(batch, hashes)])
+            created += conn.total_changes - changes
+        finally:
+            conn.close()
+    invalidate_id_cache("users")
+
+    seconds = time.perf_counter() - start
+    rate = len(users) / seconds if seconds > 0 else 0.0
+    print(f"{created} utilisateur(s) créé(s) sur {len(users)} en {seconds:.2f} s ({rate:.1f} comptes/s)")
+    return created
+
 def insert_user(username, password, role, full_name=None):
     conn = getConnection()
     cursor = conn.cursor()
-    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    password_hash = hash_password(password)
     try:
         cursor.execute("""
             INSERT INTO users (username, password, role, full_name)
@@ -297,6 +753,7 @@ def insert_user(username, password, role, full_name=None):
         """, (username, password_hash, role, full_name))
         user_id = cursor.lastrowid
         conn.commit()
+        invalidate_id_cache("users")
         # print(f"Utilisateur inséré: {username} ({role}) avec ID: {user_id}")
         return user_id
     except sqlite3.IntegrityError:
@@ -313,6 +770,143 @@ def populate_users():
     insert_user("btessier", "passetud2", "etudiant", "Bruno Tessier")
     print("--- Users remplis. ---")
 
+# --- AUTHENTIFICATION ET SESSIONS ---
+
+# Compteurs des vérifications : bcrypt (authenticate) et jeton de session (get_session_user),
+# depuis _auth_metrics_started (démarrage ou dernier reset_auth_stats())
+_auth_metrics = {
+    'password_checks': 0, 'password_failures': 0, 'password_seconds': 0.0,
+    'session_checks': 0, 'session_failures': 0, 'session_seconds': 0.0,
+}
+_auth_metrics_lock = threading.Lock()
+_auth_metrics_started = time.monotonic()
+
+# Hachage factice vérifié pour un utilisateur inconnu : même durée de réponse que pour un mauvais mot de passe
+_dummy_hash = None
+
+SESSION_QUERY = """
+SELECT u.id, u.username, u.role, u.full_name
+FROM sessions s JOIN users u ON u.id = s.user_id
+WHERE s.token_hash = ? AND s.expires_at > CURRENT_TIMESTAMP
+"""
+
+def _record_auth(kind, success, seconds):
+    with _auth_metrics_lock:
+        _auth_metrics[kind + '_checks'] += 1
+        _auth_metrics[kind + '_seconds'] += seconds
+        if not success:
+            _auth_metrics[kind + '_failures'] += 1
+
+def _token_hash(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def authenticate(username, password):
+    """
+    Vérifie un mot de passe (bcrypt, coûteux : une fois par connexion, pas par requête).
+    Retourne l'utilisateur (id, username, role, full_name) ou None.
+    """
+    global _dummy_hash
+    start = time.perf_counter()
+    conn = getConnection()
+    try:
+        user = conn.execute("SELECT id, username, role, full_name, password FROM users WHERE username = ?",
+                            (username,)).fetchone()
+    finally:
+        conn.close()
+
+    if user is None:
+        if _dummy_hash is None:
+            _dummy_hash = hash_password(secrets.token_hex(8))
+        stored, result = _dummy_hash, None
+    else:
+        stored = user['password']
+        result = {key: user[key] for key in ('id', 'username', 'role', 'full_name')}
+    if isinstance(stored, str):
+        stored = stored.encode('utf-8')
+    if not bcrypt.checkpw(password.encode('utf-8'), stored):
+        result = None
+
+    _record_auth('password', result is not None, time.perf_counter() - start)
+    return result
+
+def login(username, password):
+    """ Authentifie l'utilisateur et ouvre une session. Retourne le jeton opaque, ou None. """
+    user = authenticate(username, password)
+    if user is None:
+        return None
+    token = secrets.token_urlsafe(32)
+    conn = getConnection()
+    try:
+        conn.execute("""
+            INSERT INTO sessions (token_hash, user_id, expires_at)
+            VALUES (?, ?, datetime('now', ?))
+        """, (_token_hash(token), user['id'], f"+{SESSION_HOURS} hours"))
+        conn.commit()
+    finally:
+        conn.close()
+    return token
+
+def get_session_user(token):
+    """ Utilisateur d'une session valide (une requête indexée, sans bcrypt), ou None. """
+    start = time.perf_counter()
+    conn = getConnection()
+    try:
+        row = conn.execute(SESSION_QUERY, (_token_hash(token),)).fetchone()
+    finally:
+        conn.close()
+    user = {key: row[key] for key in ('id', 'username', 'role', 'full_name')} if row else None
+    _record_auth('session', user is not None, time.perf_counter() - start)
+    return user
+
+def logout(token):
+    """ Ferme une session. Retourne True si elle existait. """
+    conn = getConnection()
+    try:
+        cursor = conn.execute("DELETE FROM sessions WHERE token_hash = ?", (_token_hash(token),))
+        conn.commit()
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
+
+def purge_expired_sessions():
+    """ Supprime les sessions expirées. Retourne le nombre de sessions supprimées. """
+    conn = getConnection()
+    try:
+        cursor = conn.execute("DELETE FROM sessions WHERE expires_at <= CURRENT_TIMESTAMP")
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+def auth_stats():
+    """
+    Statistiques des vérifications depuis le démarrage (ou le dernier reset_auth_stats()) : pour 'password'
+    et 'session', nombre, échecs, latence moyenne (ms) et débit réel (vérifications par seconde d'horloge,
+    qui tient compte des vérifications faites en parallèle).
+    """
+    with _auth_metrics_lock:
+        metrics = dict(_auth_metrics)
+        elapsed = time.monotonic() - _auth_metrics_started
+    stats = {'elapsed_seconds': elapsed}
+    for kind in ('password', 'session'):
+        checks = metrics[kind + '_checks']
+        seconds = metrics[kind + '_seconds']
+        stats[kind] = {
+            'checks': checks,
+            'failures': metrics[kind + '_failures'],
+            'latency_ms': seconds / checks * 1000 if checks else 0.0,
+            'checks_per_second': checks / elapsed if elapsed > 0 else 0.0,
+        }
+    return stats
+
+def reset_auth_stats():
+    """ Remet les compteurs à zéro : le débit est ensuite mesuré à partir de maintenant (ex. test de charge). """
+    global _auth_metrics_started
+    with _auth_metrics_lock:
+        for key in _auth_metrics:
+            _auth_metrics[key] = 0.0 if key.endswith('_seconds') else 0
+        _auth_metrics_started = time.monotonic()
+
 # --- INSTRUCTORS ---
 def insert_instructor(user_id, name, speciality, unavailable_slots="", active=1):
     conn = getConnection()
@@ -323,7 +917,15 @@ def insert_instructor(user_id, name, speciality, unavailable_slots="", active=1)
             VALUES (?, ?, ?, ?, ?)
         """, (user_id, name, speciality, unavailable_slots, active))
         instructor_id = cursor.lastrowid
+        # indisponibilités de la colonne texte, dans la même transaction
+        cursor.executemany("""
+            INSERT INTO teacher_unavailability (instructor_id, day, start_hour, duration, reason)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(instructor_id, day, start_hour, duration, UNAVAILABLE_SLOTS_REASON)
+              for day, start_hour, duration in parse_unavailable_slots(unavailable_slots)])
         conn.commit()
+        invalidate_id_cache("instructors")
+        invalidate_unavailability_masks()
         print(f"Instructeur inséré: {name} (ID: {instructor_id})")
         return instructor_id
     except sqlite3.IntegrityError:
@@ -353,6 +955,7 @@ def insert_room(name, room_type, capacity, equipments="", active=1):
         """, (name, room_type, capacity, equipments, active))
         room_id = cursor.lastrowid
         conn.commit()
+        invalidate_id_cache("rooms")
         print(f"Salle insérée: {name} (Capacité: {capacity})")
         return room_id
     except sqlite3.IntegrityError:
@@ -380,6 +983,7 @@ def insert_subject(name, code, hours_total, subject_type, required_equipment="")
         """, (name, code, hours_total, subject_type, required_equipment))
         subject_id = cursor.lastrowid
         conn.commit()
+        invalidate_id_cache("subjects")
         print(f"Matière insérée: {name} ({code})")
         return subject_id
     except sqlite3.IntegrityError:
@@ -408,6 +1012,7 @@ def insert_group(name, student_count, filiere, active=1):
         """, (name, student_count, filiere, active))
         group_id = cursor.lastrowid
         conn.commit()
+        invalidate_id_cache("groups")
         print(f"Groupe inséré: {name}")
         return group_id
     except sqlite3.IntegrityError:
@@ -520,70 +1125,277 @@ def populate_subject_instructors():
     
     print("--- Relations Matières ↔ Enseignants remplies. ---")
 
+# --- INDISPONIBILITÉS DES ENSEIGNANTS ---
+
+def parse_unavailable_slots(text):
+    """
+    Convertit le format texte de instructors.unavailable_slots ("Lundi_08-10,Mercredi_14-16")
+    en tuples (day, start_hour, duration). Les entrées mal formées sont ignorées.
+    """
+    slots = []
+    for entry in (text or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            day_name, hours = entry.split("_")
+            start_hour, end_hour = (int(hour) for hour in hours.split("-"))
+            day = DAY_NUMBERS[day_name.strip().lower()]
+        except (ValueError, KeyError):
+            day = None
+        if day is None or not 0 <= start_hour < end_hour <= MASK_DAY_BITS:
+            print(f"Indisponibilité ignorée (format attendu Jour_HH-HH) : {entry}")
+            continue
+        slots.append((day, start_hour, end_hour - start_hour))
+    return slots
+
+def sync_unavailable_slots(instructor_ids=None):
+    """
+    Met à jour en une transaction les lignes de teacher_unavailability issues de
+    instructors.unavailable_slots (les lignes saisies directement ne sont pas touchées), pour tous
+    les enseignants ou seulement ceux de instructor_ids. Seules les différences sont écrites :
+    sans changement, aucune ligne n'est modifiée (ni journalisée dans change_log).
+    Retourne le nombre de lignes créées ou supprimées.
+    """
+    selected = None if instructor_ids is None else set(instructor_ids)
+    conn = getConnection()
+    try:
+        with transaction():
+            # lignes attendues (avec multiplicité) d'après la colonne texte
+            expected = Counter((instructor_id, day, start_hour, duration)
+                               for instructor_id, text in conn.execute("SELECT id, unavailable_slots FROM instructors")
+                               if selected is None or instructor_id in selected
+                               for day, start_hour, duration in parse_unavailable_slots(text))
+            obsolete = []
+            for id, instructor_id, day, start_hour, duration in conn.execute("""
+                SELECT id, instructor_id, day, start_hour, duration FROM teacher_unavailability WHERE reason = ?
+            """, (UNAVAILABLE_SLOTS_REASON,)):
+                if selected is not None and instructor_id not in selected:
+                    continue
+                key = (instructor_id, day, start_hour, duration)
+                if expected[key] > 0:
+                    expected[key] -= 1
+                else:
+                    obsolete.append((id,))
+            missing = [key + (UNAVAILABLE_SLOTS_REASON,) for key, count in expected.items() for _ in range(count)]
+
+            conn.executemany("DELETE FROM teacher_unavailability WHERE id = ?", obsolete)
+            conn.executemany("""
+                INSERT INTO teacher_unavailability (instructor_id, day, start_hour, duration, reason)
+                VALUES (?, ?, ?, ?, ?)
+            """, missing)
+    finally:
+        conn.close()
+    if obsolete or missing:
+        invalidate_unavailability_masks()
+    return len(obsolete) + len(missing)
+
+def hours_mask(day, start_hour, duration):
+    """ Masque hebdomadaire des heures [start_hour, start_hour + duration) d'un jour. """
+    duration = min(duration, MASK_DAY_BITS - start_hour)
+    if duration <= 0:
+        return 0
+    return ((1 << duration) - 1) << ((day - 1) * MASK_DAY_BITS + start_hour)
+
+# Dernière modification de teacher_unavailability journalisée dans change_log (y compris celles
+# faites par un autre processus) : une recherche dans idx_change_log_table
+UNAVAILABILITY_VERSION_QUERY = "SELECT MAX(seq) FROM change_log WHERE table_name = 'teacher_unavailability'"
+
+def unavailability_masks(rows):
+    """ Masques hebdomadaires par enseignant des lignes (instructor_id, day, start_hour, duration). """
+    masks = {}
+    for instructor_id, day, start_hour, duration in rows:
+        masks[instructor_id] = masks.get(instructor_id, 0) | hours_mask(day, start_hour, duration)
+    return masks
+
+# Masques d'indisponibilité par enseignant, et version de teacher_unavailability dont ils sont issus
+_unavailability_masks = None
+_unavailability_masks_db = None
+_unavailability_masks_version = None
+
+def get_unavailability_masks():
+    """
+    Dictionnaire instructor_id -> masque hebdomadaire des heures d'indisponibilité.
+    Recalculé en une requête seulement si teacher_unavailability a changé depuis (d'après change_log),
+    y compris par un autre processus.
+    """
+    global _unavailability_masks, _unavailability_masks_db, _unavailability_masks_version
+    conn = getConnection()
+    try:
+        version = conn.execute(UNAVAILABILITY_VERSION_QUERY).fetchone()[0]
+        masks = _unavailability_masks
+        if masks is not None and _unavailability_masks_db == DB_NAME and _unavailability_masks_version == version:
+            return masks
+
+        # version lue avant les lignes : une écriture concurrente provoque au pire un recalcul de trop
+        masks = unavailability_masks(conn.execute(
+            "SELECT instructor_id, day, start_hour, duration FROM teacher_unavailability"))
+    finally:
+        conn.close()
+    _unavailability_masks = masks
+    _unavailability_masks_db = DB_NAME
+    _unavailability_masks_version = version
+    return masks
+
+def invalidate_unavailability_masks():
+    global _unavailability_masks
+    _unavailability_masks = None
+
+def is_instructor_unavailable(instructor_id, day, start_hour, duration, masks=None):
+    """ True si l'enseignant est indisponible sur une partie de la plage (masks : get_unavailability_masks()). """
+    if masks is None:
+        masks = get_unavailability_masks()
+    return bool(masks.get(instructor_id, 0) & hours_mask(day, start_hour, duration))
+
+# --- INDEX DE CONFLITS EN MÉMOIRE ---
+
+# Index utilisé par check_conflict une fois activé par load_conflict_index() (None : requêtes SQL)
+_conflict_index = None
+_conflict_index_db = None
+
+def load_conflict_index():
+    """
+    (Re)construit l'index des intervalles occupés depuis la base et l'active pour check_conflict.
+    À appeler au démarrage ; insert_schedule_slot le tient ensuite à jour.
+    """
+    global _conflict_index, _conflict_index_db
+    conn = getConnection()
+    try:
+        index = ConflictIndex.from_connection(conn)
+    finally:
+        conn.close()
+    _conflict_index = index
+    _conflict_index_db = DB_NAME
+    return index
+
+def invalidate_conflict_index():
+    """ Marque l'index à reconstruire après une écriture qu'il ne suit pas (publication, annulation). """
+    if _conflict_index is not None:
+        _conflict_index.stale = True
+
+def _current_conflict_index():
+    if _conflict_index is None:
+        return None
+    if _conflict_index.stale or _conflict_index_db != DB_NAME:
+        return load_conflict_index()
+    return _conflict_index
+
 # --- FONCTION CRITIQUE : VÉRIFICATION DE CONFLIT D'HORAIRE ---
 
+# Conflit si un enregistrement existant chevauche la nouvelle plage [start_hour, end_hour]
+# (Existing_Start < New_End) AND (New_Start < Existing_End)
+CONFLICT_QUERY = """
+SELECT 
+    'Enseignant' AS type, instructor_id AS entity_id 
+FROM timetable 
+WHERE day = ? AND instructor_id = ? 
+AND (start_hour < ?) AND (? < start_hour + duration)
+UNION ALL
+SELECT 
+    'Groupe', group_id
+FROM timetable 
+WHERE day = ? AND group_id = ?
+AND (start_hour < ?) AND (? < start_hour + duration)
+UNION ALL
+SELECT 
+    'Salle', room_id
+FROM timetable 
+WHERE day = ? AND room_id = ?
+AND (start_hour < ?) AND (? < start_hour + duration);
+"""
+
+# Vérifie une plage contre tous les créneaux, quel que soit leur semestre : c'est la règle des créneaux
+# sans semestre (insert_schedule_slot), qui s'appliquent à tous les semestres
 def check_conflict(instructor_id, group_id, room_id, day, start_hour, duration):
+    index = _current_conflict_index()
+    if index is not None:
+        conflict_message = index.check(instructor_id, group_id, room_id, day, start_hour, duration)
+        return conflict_message or _unavailability_message(instructor_id, day, start_hour, duration)
+
     conn = getConnection()
     cursor = conn.cursor()
     end_hour = start_hour + duration
     
-    # 1. Vérification des conflits dans la table 'timetable'
-    # Conflit si un enregistrement existant chevauche la nouvelle plage [start_hour, end_hour]
-    # (Existing_Start < New_End) AND (New_Start < Existing_End)
-    
-    query = """
-    SELECT 
-        'Enseignant' AS type, instructor_id AS entity_id 
-    FROM timetable 
-    WHERE day = ? AND instructor_id = ? 
-    AND (start_hour < ?) AND (? < start_hour + duration)
-    UNION ALL
-    SELECT 
-        'Groupe', group_id
-    FROM timetable 
-    WHERE day = ? AND group_id = ?
-    AND (start_hour < ?) AND (? < start_hour + duration)
-    UNION ALL
-    SELECT 
-        'Salle', room_id
-    FROM timetable 
-    WHERE day = ? AND room_id = ?
-    AND (start_hour < ?) AND (? < start_hour + duration);
-    """
-    
+    # 1. Vérification des conflits dans la table 'timetable' (CONFLICT_QUERY)
     params = [
         day, instructor_id, end_hour, start_hour,
         day, group_id, end_hour, start_hour,
         day, room_id, end_hour, start_hour
     ]
     
-    cursor.execute(query, params)
+    cursor.execute(CONFLICT_QUERY, params)
     conflict = cursor.fetchone()
+    conn.close()
     
     if conflict:
-        conn.close()
         return f"Conflit d'horaire existant pour l'entité : {conflict['type']} (ID: {conflict['entity_id']})."
 
-    # 2. Vérification des indisponibilités de l'enseignant (teacher_unavailability)
-    unavail_query = """
-    SELECT 
-        id
-    FROM teacher_unavailability 
-    WHERE instructor_id = ? AND day = ? 
-    AND (start_hour < ?) AND (? < start_hour + duration);
-    """
-    unavail_params = [instructor_id, day, end_hour, start_hour]
-    
-    cursor.execute(unavail_query, unavail_params)
-    unavailability = cursor.fetchone()
-    
-    conn.close()
-    
-    if unavailability:
+    # 2. Vérification des indisponibilités de l'enseignant (masque précalculé, sans requête)
+    return _unavailability_message(instructor_id, day, start_hour, duration)
+
+def _unavailability_message(instructor_id, day, start_hour, duration, masks=None):
+    if is_instructor_unavailable(instructor_id, day, start_hour, duration, masks):
         return "L'enseignant est marqué comme indisponible sur cette plage horaire."
-        
     return None # Aucun conflit détecté
 
+def check_conflicts_batch(candidates):
+    """
+    Vérifie en une passe une liste de créneaux candidats
+    (tuples instructor_id, group_id, room_id, day, start_hour, duration).
+    Retourne, dans le même ordre, le résultat de check_conflict pour chacun.
+    """
+    candidates = list(candidates)
+    if not candidates:
+        return []
+    index = _current_conflict_index()
+    if index is None:
+        index = _load_candidates_index(candidates)
+    # masques vérifiés une fois pour tout le lot
+    masks = get_unavailability_masks()
+    return [index.check(*candidate) or _unavailability_message(candidate[0], *candidate[3:], masks)
+            for candidate in candidates]
+
+def candidates_index_query(days, instructors, groups, rooms):
+    """
+    Requête des créneaux existants des jours et entités donnés : une branche par type d'entité, chacune
+    servie par le préfixe (jour, entité) de son index. Retourne (requête, paramètres).
+    """
+    def placeholders(values):
+        return ", ".join("?" * len(values))
+
+    branches = []
+    params = []
+    for column, ids in (("instructor_id", instructors), ("group_id", groups), ("room_id", rooms)):
+        if ids:
+            branches.append(f"""
+                SELECT id, instructor_id, group_id, room_id, day, start_hour, duration FROM timetable
+                WHERE day IN ({placeholders(days)}) AND {column} IN ({placeholders(ids)})
+            """)
+            params += list(days) + list(ids)
+    return " UNION ALL ".join(branches), params
+
+def _load_candidates_index(candidates):
+    # Index temporaire limité aux jours et entités des candidats, en une requête
+    # (une entité absente, None, ne participe pas à la recherche, comme dans check_conflict)
+    instructors, groups, rooms, days = (sorted({value for value in column if value is not None})
+                                        for column in list(zip(*candidates))[:4])
+    index = ConflictIndex()
+    query, params = candidates_index_query(days, instructors, groups, rooms)
+    if not query:
+        return index
+
+    conn = getConnection()
+    try:
+        # un créneau trouvé par plusieurs branches n'est ajouté qu'une fois
+        seen = set()
+        for row in conn.execute(query, params):
+            if row[0] not in seen:
+                seen.add(row[0])
+                index.add_slot(*row[1:])
+    finally:
+        conn.close()
+    return index
+
 # --- TIMETABLE (EMPLOI DU TEMPS) ---
 
 def insert_schedule_slot(course_id, instructor_id, group_id, room_id, day, start_hour, duration, created_by=None):
@@ -602,6 +1414,8 @@ def insert_schedule_slot(course_id, instructor_id, group_id, room_id, day, start
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """, (course_id, instructor_id, group_id, room_id, day, start_hour, duration, created_by))
         conn.commit()
+        if _conflict_index is not None:
+            _conflict_index.add_slot(instructor_id, group_id, room_id, day, start_hour, duration)
         return True
     except sqlite3.IntegrityError as e:
         print(f"Erreur d'intégrité lors de l'insertion d'un créneau: {e}")
@@ -609,6 +1423,248 @@ def insert_schedule_slot(course_id, instructor_id, group_id, room_id, day, start
     finally:
         conn.close()
 
+# --- JOURNAL DES MODIFICATIONS ---
+
+# Conservation du journal : setup() supprime les lignes plus anciennes (prune_changes). Un consommateur
+# qui n'a pas lu le journal depuis plus longtemps trouve un trou dans les seq et doit tout invalider
+CHANGE_LOG_RETENTION_DAYS = 7
+
+def current_change_seq():
+    """ Numéro de la dernière modification journalisée (0 si aucune) : point de départ d'un consommateur. """
+    conn = getConnection()
+    try:
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+    finally:
+        conn.close()
+
+def changes_since(seq, limit=None):
+    """
+    Modifications de timetable, reservations et teacher_unavailability postérieures à 'seq',
+    par ordre croissant (au plus 'limit' lignes ; reprendre ensuite au seq de la dernière).
+    """
+    conn = getConnection()
+    try:
+        return conn.execute("SELECT * FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?",
+                            (seq, -1 if limit is None else limit)).fetchall()
+    finally:
+        conn.close()
+
+def prune_changes(before_seq=None, days=CHANGE_LOG_RETENTION_DAYS):
+    """
+    Supprime les lignes de change_log de seq inférieur à before_seq ou, par défaut, plus vieilles
+    que 'days' jours. Les seq ne sont jamais réutilisés. Retourne le nombre de lignes supprimées.
+    """
+    conn = getConnection()
+    try:
+        with transaction():
+            if before_seq is None:
+                cursor = conn.execute("DELETE FROM change_log WHERE changed_at < datetime('now', ?)",
+                                      (f"-{days} days",))
+            else:
+                cursor = conn.execute("DELETE FROM change_log WHERE seq < ?", (before_seq,))
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+def affected_entities(changes):
+    """ Ensembles des ids touchés par des modifications : {'instructor': {...}, 'group': {...}, 'room': {...}}. """
+    affected = {kind: set() for kind in ('instructor', 'group', 'room')}
+    for change in changes:
+        for kind in affected:
+            for column in (f"{kind}_id", f"old_{kind}_id"):
+                if change[column] is not None:
+                    affected[kind].add(change[column])
+    return affected
+
+# --- PUBLICATION EN MASSE D'UN EMPLOI DU TEMPS ---
+
+def find_slot_conflicts(slots, unavailability=()):
+    """
+    Vérifie en mémoire un ensemble complet de créneaux.
+    slots : tuples (course_id, instructor_id, group_id, room_id, day, start_hour, duration)
+    unavailability : tuples (instructor_id, day, start_hour, duration)
+    Les lignes d'une même séance (même cours, enseignant, salle et horaire, plusieurs groupes)
+    ne sont pas en conflit entre elles. Retourne la liste des messages de conflit.
+    """
+    # (type, entité, jour) -> ensemble d'intervalles (début, fin, séance) ; séance None = indisponibilité
+    intervals = {}
+    for course_id, instructor_id, group_id, room_id, day, start_hour, duration in slots:
+        session = (course_id, instructor_id, room_id, day, start_hour, duration)
+        for kind, entity_id in (('Enseignant', instructor_id), ('Groupe', group_id), ('Salle', room_id)):
+            intervals.setdefault((kind, entity_id, day), set()).add((start_hour, start_hour + duration, session))
+
+    for instructor_id, day, start_hour, duration in unavailability:
+        key = ('Enseignant', instructor_id, day)
+        if key in intervals:
+            intervals[key].add((start_hour, start_hour + duration, None))
+
+    conflicts = []
+    for (kind, entity_id, day), items in intervals.items():
+        # balayage par heure de début : fin maximale des séances et de tous les intervalles déjà vus
+        max_end_session = max_end_any = -1
+        for start_hour, end_hour, session in sorted(items, key=lambda item: (item[0], item[1])):
+            if session is None:
+                if start_hour < max_end_session:
+                    conflicts.append(f"Enseignant (ID: {entity_id}) indisponible le jour {day} à {start_hour}h.")
+            elif start_hour < max_end_any:
+                conflicts.append(f"Conflit d'horaire pour l'entité : {kind} (ID: {entity_id}) le jour {day} à {start_hour}h.")
+            if session is not None:
+                max_end_session = max(max_end_session, end_hour)
+            max_end_any = max(max_end_any, end_hour)
+    return conflicts
+
+def replace_semester_timetable(semester, slots, created_by=None):
+    """
+    Remplace tous les créneaux d'un semestre par 'slots' en une seule transaction.
+    La validation des conflits est faite avant toute écriture, en mémoire, sur l'ensemble des créneaux,
+    puis contre les créneaux conservés qui s'appliquent à ce semestre (ceux sans semestre, insérés par
+    insert_schedule_slot ; ceux des autres semestres ne sont pas en conflit).
+    """
+    slots = list(slots)
+    conn = getConnection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT instructor_id, day, start_hour, duration FROM teacher_unavailability")
+        conflicts = find_slot_conflicts(slots, [tuple(row) for row in cursor.fetchall()])
+        if conflicts:
+            print(f"Échec de la publication : {conflicts[0]} ({len(conflicts)} conflit(s))")
+            return False
+
+        index = ConflictIndex.from_connection(conn, semester, replacing=True)
+        for course_id, instructor_id, group_id, room_id, day, start_hour, duration in slots:
+            conflict_message = index.check(instructor_id, group_id, room_id, day, start_hour, duration)
+            if conflict_message:
+                print(f"Échec de la publication : {conflict_message}")
+                return False
+
+        # point de sauvegarde : dans un bloc transaction(), rollback() est différé et n'annulerait pas le DELETE
+        cursor.execute("SAVEPOINT replace_semester")
+        try:
+            cursor.execute("DELETE FROM timetable WHERE semester = ?", (semester,))
+            cursor.executemany("""
+                INSERT INTO timetable (course_id, instructor_id, group_id, room_id, day, start_hour, duration, created_by, semester)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [tuple(slot) + (created_by, semester) for slot in slots])
+        except sqlite3.Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT replace_semester")
+            raise
+        finally:
+            cursor.execute("RELEASE SAVEPOINT replace_semester")
+        conn.commit()
+        invalidate_conflict_index()
+        return True
+    except sqlite3.IntegrityError as e:
+        conn.rollback()
+        print(f"Erreur d'intégrité lors de la publication de l'emploi du temps: {e}")
+        return False
+    finally:
+        conn.close()
+
+# --- VUES HEBDOMADAIRES MATÉRIALISÉES ---
+
+# Colonne de timetable_view filtrée par chaque vue hebdomadaire
+WEEKLY_VIEWS = {
+    'group': 'group_id',
+    'instructor': 'instructor_id',
+    'room': 'room_id',
+}
+
+def weekly_timetable_query(kind):
+    return f"""
+    SELECT day, start_hour, duration, semester, subject_name, instructor_name, group_name, room_name,
+           created_at, updated_at
+    FROM timetable_view WHERE {WEEKLY_VIEWS[kind]} = ? AND (semester IS NULL OR semester = ?)
+    ORDER BY day, start_hour
+    """
+
+def get_weekly_timetable(kind, entity_id, semester=None):
+    """
+    Semaine d'un groupe, d'un enseignant ou d'une salle (kind : 'group', 'instructor' ou 'room'),
+    lue dans la vue matérialisée : une recherche indexée, sans jointure.
+    La semaine d'un semestre comprend ses créneaux et ceux sans semestre (valables pour tous les
+    semestres) ; semester=None : seulement les créneaux sans semestre.
+    """
+    conn = getConnection()
+    try:
+        return conn.execute(weekly_timetable_query(kind), (entity_id, semester)).fetchall()
+    finally:
+        conn.close()
+
+# Version de l'emploi du temps : dernière modification, lue en bout d'index (updated_at)
+TIMETABLE_VERSION_QUERY = "SELECT MAX(updated_at) FROM timetable"
+
+def timetable_version():
+    """
+    Retourne MAX(updated_at) de timetable : change à chaque insertion ou modification.
+    Une suppression seule ou deux écritures dans la même seconde ne la changent pas.
+    """
+    conn = getConnection()
+    try:
+        return conn.execute(TIMETABLE_VERSION_QUERY).fetchone()[0]
+    finally:
+        conn.close()
+
+def refresh_timetable_views():
+    """ Reconstruit entièrement la vue matérialisée depuis timetable, en une transaction. """
+    conn = getConnection()
+    try:
+        with transaction():
+            conn.execute("DELETE FROM timetable_view")
+            cursor = conn.execute(f"INSERT INTO timetable_view ({TIMETABLE_VIEW_COLUMNS}) {TIMETABLE_VIEW_SELECT}")
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+# --- PLANS D'EXÉCUTION DES REQUÊTES CRITIQUES ---
+
+# Requêtes fréquentes : (nom, requête, paramètres d'exemple, index attendus).
+# Aucune ne doit parcourir une table entière ; les index attendus doivent apparaître dans le plan
+# (un index partiel, ex. sur le seul jour, donnerait un SEARCH mais lirait toute la journée)
+HOT_QUERIES = [
+    ("check_conflict", CONFLICT_QUERY, (1, 1, 12, 10, 1, 1, 12, 10, 1, 1, 12, 10),
+     ("idx_timetable_instructor", "idx_timetable_group", "idx_timetable_room")),
+    ("get_user_id_by_username", "SELECT id FROM users WHERE username = ?", ("admin",), ()),
+    ("get_id_by_name (instructors)", "SELECT id FROM instructors WHERE name = ?", ("Pierre Dupont",), ("idx_instructors_name",)),
+    ("get_id_by_name (groups)", "SELECT id FROM groups WHERE name = ?", ("L3_INFO_G1",), ()),
+    ("get_id_by_name (subjects)", "SELECT id FROM subjects WHERE code = ?", ("GL-M101",), ()),
+    ("get_id_by_name (rooms)", "SELECT id FROM rooms WHERE name = ?", ("A101",), ()),
+    ("replace_semester_timetable", "DELETE FROM timetable WHERE semester = ?", ("S1",), ("idx_timetable_semester",)),
+    ("get_session_user", SESSION_QUERY, ("0" * 64,), ()),
+    ("get_weekly_timetable (group)", weekly_timetable_query('group'), (1, "S1"), ("idx_timetable_view_group",)),
+    ("get_weekly_timetable (instructor)", weekly_timetable_query('instructor'), (1, "S1"), ("idx_timetable_view_instructor",)),
+    ("get_weekly_timetable (room)", weekly_timetable_query('room'), (1, "S1"), ("idx_timetable_view_room",)),
+    ("timetable_version", TIMETABLE_VERSION_QUERY, (), ("idx_timetable_updated_at",)),
+    ("check_conflicts_batch", *candidates_index_query((1, 2), (1, 2), (1, 2), (1, 2)),
+     ("idx_timetable_instructor", "idx_timetable_group", "idx_timetable_room")),
+    ("changes_since", "SELECT * FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?", (0, 100), ()),
+    ("get_unavailability_masks", UNAVAILABILITY_VERSION_QUERY, (), ("idx_change_log_table",)),
+]
+
+def explain_query_plan(query, params=()):
+    """ Retourne les lignes 'detail' de EXPLAIN QUERY PLAN pour une requête. """
+    # Connexion dédiée, hors pool : le cache de requêtes préparées d'une connexion réutilisée
+    # peut renvoyer un plan calculé avant un changement de schéma
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params).fetchall()]
+    finally:
+        conn.close()
+
+def check_query_plans():
+    """
+    Vérifie que chaque requête de HOT_QUERIES utilise ses index (voir test_query_plans.py).
+    Retourne un dictionnaire {nom de la requête: problèmes} (vide si tout est indexé).
+    """
+    problems = {}
+    for name, query, params, indexes in HOT_QUERIES:
+        plan = explain_query_plan(query, params)
+        steps = [detail for detail in plan if detail.startswith('SCAN')]
+        steps += [f"index {index} non utilisé" for index in indexes
+                  if not any(f" INDEX {index} " in detail + " " for detail in plan)]
+        if steps:
+            problems[name] = steps
+    return problems
+
 def populate_timetable():
     print("\n--- Remplissage de l'Emploi du Temps (timetable) ---")
 
@@ -677,6 +1733,7 @@ def main():
     """
     # Optionnel: Supprimer l'ancienne BD pour repartir de zéro à chaque exécution
     if os.path.exists(DB_NAME):
+        close_connections()
         os.remove(DB_NAME)
         print(f"Ancien fichier {DB_NAME} supprimé.")
 
@@ -693,6 +1750,9 @@ def main():
     # 3. Remplissage des tables de relations 
     populate_subject_groups()
     populate_subject_instructors()
+
+    # Index de conflits en mémoire, construit depuis la base puis tenu à jour par insert_schedule_slot
+    load_conflict_index()
     
     # 4. Remplissage de l'Emploi du Temps (inclut désormais la vérification des conflits)
     populate_timetable()
@@ -712,19 +1772,10 @@ def main():
     cursor = conn.cursor()
     cursor.execute("""
         SELECT 
-            t.day, t.start_hour, t.duration,
-            s.name AS subject_name, 
-            i.name AS instructor_name,
-            g.name AS group_name,
-            r.name AS room_name,
-            t.created_at,
-            t.updated_at
-        FROM timetable t
-        JOIN subjects s ON t.course_id = s.id
-        JOIN instructors i ON t.instructor_id = i.id
-        JOIN groups g ON t.group_id = g.id
-        JOIN rooms r ON t.room_id = r.id
-        ORDER BY t.day, t.start_hour, g.name
+            day, start_hour, duration, subject_name, instructor_name, group_name, room_name,
+            created_at, updated_at
+        FROM timetable_view
+        ORDER BY day, start_hour, group_name
     """)
     
     for row in cursor.fetchall():
@@ -733,7 +1784,14 @@ def main():
         print(f"**{day_name} {row['start_hour']:02d}h-{end_hour:02d}h** | Matière: {row['subject_name']} ({row['group_name']}) | Salle: {row['room_name']} | Enseignant: {row['instructor_name']} | Créé: {row['created_at']}")
     
     conn.close() 
+
     print("\nExécution du script de base de données terminée avec succès.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python database.py refresh-views : reconstruit timetable_view après une modification manuelle de la base
+    if sys.argv[1:] == ["refresh-views"]:
+        start = time.perf_counter()
+        count = refresh_timetable_views()
+        print(f"Vue timetable_view reconstruite : {count} créneau(x) en {time.perf_counter() - start:.2f} s")
+    else:
+        main()
@@ -0,0 +1,75 @@
+import sys
+import time
+
+import database
+from conflict_index import ConflictIndex
+
+
+def first_come_first_served(reservation):
+    """ Priorité par défaut : les demandes les plus anciennes d'abord. """
+    return (reservation['created_at'], reservation['id'])
+
+
+def process_pending_reservations(approved_by, priority=first_come_first_served):
+    """
+    Traite toutes les réservations PENDING en une passe et une transaction.
+    Les demandes sont examinées par ordre de priorité (fonction de tri sur les lignes) ; chacune est
+    approuvée si l'enseignant, le groupe et la salle sont libres (emploi du temps, réservations
+    approuvées, y compris celles de cette passe) et si l'enseignant est disponible, rejetée sinon.
+    approved_by et approved_at enregistrent la décision dans les deux cas.
+    Retourne un rapport {approved, rejected, seconds, decisions: [(id, statut, motif)]}.
+    """
+    start = time.perf_counter()
+    decisions = []
+    conn = database.getConnection()
+    try:
+        with database.transaction():
+            # occupation actuelle : emploi du temps et réservations déjà approuvées
+            index = ConflictIndex.from_connection(conn)
+            for row in conn.execute("""
+                SELECT instructor_id, group_id, room_id, day, start_hour, duration
+                FROM reservations WHERE status = 'APPROVED'
+            """):
+                index.add_slot(*row)
+            masks = database.get_unavailability_masks()
+
+            pending = conn.execute("SELECT * FROM reservations WHERE status = 'PENDING'").fetchall()
+            for reservation in sorted(pending, key=priority):
+                entities = (reservation['instructor_id'], reservation['group_id'], reservation['room_id'])
+                slot = (reservation['day'], reservation['start_hour'], reservation['duration'])
+                if slot[0] not in database.DAYS or slot[2] <= 0:
+                    message = "Créneau invalide."
+                elif masks.get(entities[0], 0) & database.hours_mask(*slot):
+                    message = "L'enseignant est marqué comme indisponible sur cette plage horaire."
+                else:
+                    message = index.check(*entities, *slot)
+
+                if message is None:
+                    # la plage est désormais occupée pour les demandes suivantes
+                    index.add_slot(*entities, *slot)
+                    decisions.append((reservation['id'], 'APPROVED', None))
+                else:
+                    decisions.append((reservation['id'], 'REJECTED', message))
+
+            conn.executemany("""
+                UPDATE reservations SET status = ?, approved_by = ?, approved_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = 'PENDING'
+            """, [(status, approved_by, id) for id, status, message in decisions])
+    finally:
+        conn.close()
+
+    seconds = time.perf_counter() - start
+    approved = sum(1 for decision in decisions if decision[1] == 'APPROVED')
+    rate = len(decisions) / seconds if seconds > 0 else 0.0
+    print(f"{len(decisions)} réservation(s) traitée(s) : {approved} approuvée(s), "
+          f"{len(decisions) - approved} rejetée(s) en {seconds:.2f} s ({rate:.0f} réservations/s)")
+    return {'approved': approved, 'rejected': len(decisions) - approved, 'seconds': seconds, 'decisions': decisions}
+
+
+if __name__ == "__main__":
+    username = sys.argv[1] if len(sys.argv) > 1 else "admin"
+    admin_id = database.get_user_id_by_username(username)
+    if admin_id is None:
+        print(f"Utilisateur inconnu : {username}")
+        sys.exit(1)
+    process_pending_reservations(admin_id)
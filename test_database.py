@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import ConfigurationLoader
+import database
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """ Base temporaire avec deux enseignants, deux groupes, deux salles et une matière. """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_name = database.DB_NAME
+        database.DB_NAME = os.path.join(self.directory.name, "test.db")
+        database.setup()
+        self.subject = database.insert_subject("Algorithmique", "AA-M102", 40, "CM")
+        self.instructors = [database.insert_instructor(None, name, "Informatique")
+                            for name in ("Pierre Dupont", "Marie Legrand")]
+        self.groups = [database.insert_group(name, 30, "Informatique") for name in ("L3_INFO_G1", "L3_INFO_G2")]
+        self.rooms = [database.insert_room(name, "Cours", 40) for name in ("A101", "A102")]
+
+    def tearDown(self):
+        database.close_connections()
+        database.DB_NAME = self.db_name
+        self.directory.cleanup()
+
+    def slot(self, instructor, group, room, day, start_hour, duration=2):
+        return (self.subject, self.instructors[instructor], self.groups[group], self.rooms[room], day, start_hour, duration)
+
+    def semester_rows(self, semester):
+        conn = database.getConnection()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM timetable WHERE semester = ?", (semester,)).fetchone()[0]
+        finally:
+            conn.close()
+
+
+class ReplaceSemesterTimetableTest(DatabaseTestCase):
+    """ Une publication refusée laisse le semestre intact, dans un bloc transaction() ou non. """
+
+    def setUp(self):
+        super().setUp()
+        self.assertTrue(database.replace_semester_timetable("S1", [self.slot(0, 0, 0, 1, 8), self.slot(0, 0, 0, 2, 8)]))
+        # créneau sans semestre : s'applique à tous les semestres
+        self.assertTrue(database.insert_schedule_slot(*self.slot(1, 1, 1, 3, 8)))
+        self.conflicting = [self.slot(1, 0, 0, 3, 8)]
+
+    def test_rejected_publication_keeps_semester(self):
+        self.assertFalse(database.replace_semester_timetable("S1", self.conflicting))
+        self.assertEqual(self.semester_rows("S1"), 2)
+
+    def test_rejected_publication_in_transaction_keeps_semester(self):
+        with database.transaction():
+            self.assertFalse(database.replace_semester_timetable("S1", self.conflicting))
+        self.assertEqual(self.semester_rows("S1"), 2)
+
+    def test_replaced_rows_do_not_conflict(self):
+        # mêmes plages que les créneaux remplacés : seuls les créneaux conservés comptent
+        self.assertTrue(database.replace_semester_timetable("S1", [self.slot(0, 0, 0, 1, 8)]))
+        self.assertEqual(self.semester_rows("S1"), 1)
+
+    def test_integrity_error_in_transaction_keeps_semester(self):
+        missing_course = (9999,) + self.slot(0, 0, 0, 4, 8)[1:]
+        with database.transaction():
+            self.assertFalse(database.replace_semester_timetable("S1", [missing_course]))
+        self.assertEqual(self.semester_rows("S1"), 2)
+
+
+class ConflictBatchTest(DatabaseTestCase):
+    """ check_conflicts_batch donne, pour chaque candidat, le résultat de check_conflict (entités absentes comprises). """
+
+    def setUp(self):
+        super().setUp()
+        self.assertTrue(database.insert_schedule_slot(*self.slot(0, 0, 0, 1, 8)))
+        self.assertTrue(database.insert_schedule_slot(*self.slot(1, 1, 1, 1, 10, 3)))
+        self.assertTrue(database.replace_semester_timetable("S1", [self.slot(1, 1, 1, 2, 14)]))
+        conn = database.getConnection()
+        conn.execute("INSERT INTO teacher_unavailability (instructor_id, day, start_hour, duration) VALUES (?, 3, 8, 2)",
+                     (self.instructors[0],))
+        conn.commit()
+        conn.close()
+        database.invalidate_unavailability_masks()
+
+        instructors = self.instructors + [None]
+        groups = self.groups + [None]
+        rooms = self.rooms + [None]
+        self.candidates = [(instructor, group, room, day, start_hour, duration)
+                           for instructor in instructors for group in groups for room in rooms
+                           for day, start_hour, duration in ((1, 7, 2), (1, 9, 2), (1, 12, 1), (2, 15, 1), (3, 9, 1), (4, 8, 2))]
+
+    def tearDown(self):
+        database._conflict_index = None
+        super().tearDown()
+
+    def test_batch_matches_check_conflict(self):
+        for indexed in (False, True):
+            with self.subTest(indexed=indexed):
+                database._conflict_index = None
+                if indexed:
+                    database.load_conflict_index()
+                expected = [database.check_conflict(*candidate) for candidate in self.candidates]
+                self.assertEqual(database.check_conflicts_batch(self.candidates), expected)
+                # chaque type de résultat est couvert : conflits d'enseignant, de groupe, de salle, indisponibilité
+                self.assertGreater(len(set(expected)), 4)
+
+
+class UnavailabilityMasksTest(DatabaseTestCase):
+    """ Les masques en cache suivent les indisponibilités ajoutées hors de ce module (autre processus). """
+
+    def insert_externally(self, instructor, day, start_hour, duration):
+        conn = sqlite3.connect(database.DB_NAME)
+        with conn:
+            conn.execute("INSERT INTO teacher_unavailability (instructor_id, day, start_hour, duration) VALUES (?, ?, ?, ?)",
+                         (self.instructors[instructor], day, start_hour, duration))
+        conn.close()
+
+    def test_external_insert_is_seen_by_check_conflict(self):
+        instructor_id = self.instructors[0]
+        self.assertIsNone(database.check_conflict(instructor_id, None, None, 3, 8, 2))
+        self.insert_externally(0, 3, 8, 2)
+        self.assertIsNotNone(database.check_conflict(instructor_id, None, None, 3, 8, 2))
+        self.assertIsNotNone(database.check_conflicts_batch([(instructor_id, None, None, 3, 8, 2)])[0])
+
+    def test_external_insert_is_seen_by_loader(self):
+        ConfigurationLoader.load_configuration()
+        database.get_unavailability_masks()
+        self.insert_externally(0, 1, 8, 2)
+        # instantané recompilé (nouvelle empreinte) avec l'indisponibilité du lundi 8h-10h
+        configuration = ConfigurationLoader.load_configuration()
+        self.assertEqual(configuration.GetProfessorById(self.instructors[0]).unavailableHours, 0b11)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import random
+import unittest
+
+import numpy as np
+
+import Schedule
+from Configuration import Configuration, CourseClass, Professor, Room, StudentsGroup
+from GeneticAlgorithm import GeneticAlgorithm
+from PopulationFitness import PopulationEvaluator
+
+
+# Builds a small instance exercising every criterion : shared professors and groups, a course with
+# two groups, lab classes, a small room and professor unavailabilities, on a 6 x 5 week
+def make_configuration():
+    configuration = Configuration()
+    configuration.dayHours = 6
+    configuration.daysNum = 5
+    professors = [ configuration.AddProfessor( Professor( i, f"P{i}", unavailableHours ) )
+                   for i, unavailableHours in enumerate( ( 0b111, 0, 0b11 << 12 ) ) ]
+    groups = [ configuration.AddStudentsGroup( StudentsGroup( i, f"G{i}", 20 + 5 * i ) ) for i in range( 4 ) ]
+    configuration.AddRoom( Room( 1, "A101", False, 60 ) )
+    configuration.AddRoom( Room( 2, "B201", False, 25 ) )
+    configuration.AddRoom( Room( 3, "LABO", True, 30, ( "PC fixes", ) ) )
+    for k in range( 12 ):
+        classGroups = groups[ k % 4 : k % 4 + 2 ] if k % 5 == 0 else [ groups[ k % 4 ] ]
+        lab = k % 3 == 0
+        configuration.AddCourseClass( CourseClass( professors[ k % 3 ], k, classGroups, lab, 1 + k % 2,
+                                                   ( "PC fixes", ) if lab else () ) )
+    configuration.BuildConflicts()
+    configuration.BuildRoomSuitability()
+    return configuration
+
+
+class FitnessTest(unittest.TestCase):
+    """ Les évaluations rapides (incrémentale, vectorisée) donnent les mêmes résultats que CalculateFitness. """
+
+    def setUp(self):
+        random.seed( 7 )
+        self.configuration = make_configuration()
+
+    def tearDown(self):
+        Schedule.Schedule.checkIncremental = False
+
+    def test_incremental_matches_full(self):
+        # chaque mutation incrémentale est comparée au recalcul complet (RuntimeError sinon)
+        Schedule.Schedule.checkIncremental = True
+        for compact in ( True, False ):
+            with self.subTest( compact=compact ):
+                ga = GeneticAlgorithm( self.configuration, numberOfChromosomes=20, mutationProbability=100,
+                                       compact=compact, incremental=True )
+                ga.Run( 200, stopOnFeasible=False )
+                self.assertEqual( ga.GetCurrentGeneration(), 200 )
+
+    def test_population_evaluator_matches_calculate_fitness(self):
+        # population aléatoire : chacun des 5 critères est violé par plusieurs chromosomes
+        ga = GeneticAlgorithm( self.configuration, numberOfChromosomes=50 )
+        ga.Initialize()
+        positions = np.stack( [ np.frombuffer( c.GetCode(), dtype=np.int32 ) for c in ga.chromosomes ] )
+        fitness, criteria, score = PopulationEvaluator( self.configuration ).Evaluate( positions )
+        for i, c in enumerate( ga.chromosomes ):
+            self.assertEqual( criteria[ i ].tolist(), c.criteria )
+            self.assertAlmostEqual( score[ i ], c.score, places=9 )
+            self.assertAlmostEqual( fitness[ i ], c.GetFitness(), places=9 )
+
+    def test_population_evaluator_uses_configuration_grid(self):
+        # grille du module Schedule différente de celle de l'instance (aucun GeneticAlgorithm construit dessus)
+        Schedule.SetInstance( self.configuration, 4, 5 )
+        evaluator = PopulationEvaluator( self.configuration )
+        self.assertEqual( ( evaluator.dayHours, evaluator.daysNum ), ( 6, 5 ) )
+
+
+if __name__ == "__main__":
+    unittest.main()
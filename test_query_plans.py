@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+
+import database
+
+
+class QueryPlanTest(unittest.TestCase):
+    """ Les requêtes critiques (database.HOT_QUERIES) doivent utiliser leurs index, sans parcours complet. """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_name = database.DB_NAME
+        database.DB_NAME = os.path.join(self.directory.name, "plans.db")
+        database.setup()
+
+    def tearDown(self):
+        database.close_connections()
+        database.DB_NAME = self.db_name
+        self.directory.cleanup()
+
+    def test_hot_queries_use_their_indexes(self):
+        for name, query, params, indexes in database.HOT_QUERIES:
+            with self.subTest(query=name):
+                plan = database.explain_query_plan(query, params)
+                self.assertEqual([detail for detail in plan if detail.startswith('SCAN')], [], plan)
+                for index in indexes:
+                    self.assertTrue(any(f" INDEX {index} " in detail + " " for detail in plan),
+                                    f"index {index} non utilisé : {plan}")
+
+    def test_dropped_index_is_detected(self):
+        conn = database.getConnection()
+        conn.execute("DROP INDEX idx_timetable_group")
+        conn.close()
+        self.assertIn("check_conflict", database.check_query_plans())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import database
+
+# Durée de vie d'une réponse en cache : le journal des modifications ne suit pas les renommages
+# de matière, d'enseignant, de groupe ou de salle
+CACHE_TTL = 5.0
+CACHE_SIZE = 50000
+
+# Réponses en cache : (kind, entity_id, semestre) -> (seq du journal lu avant le calcul, heure de calcul, corps JSON, ETag)
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Dernière modification lue dans change_log, et seq de la dernière modification de chaque entité
+_last_seq = None
+_changed = {}
+_changes_lock = threading.Lock()
+
+
+def sync_changes():
+    """ Lit les nouvelles lignes de change_log et marque les entités touchées ; retourne le dernier seq lu. """
+    global _last_seq
+    with _changes_lock:
+        if _last_seq is None:
+            # démarrage : le cache est vide, seules les modifications suivantes comptent
+            _last_seq = database.current_change_seq()
+            return _last_seq
+        changes = database.changes_since(_last_seq)
+        if changes and changes[0]['seq'] != _last_seq + 1:
+            # lignes supprimées par prune_changes avant d'avoir été lues : tout le cache est suspect
+            with _cache_lock:
+                _cache.clear()
+        if changes:
+            _last_seq = changes[-1]['seq']
+            for kind, entity_ids in database.affected_entities(changes).items():
+                for entity_id in entity_ids:
+                    _changed[(kind, entity_id)] = _last_seq
+        return _last_seq
+
+
+def weekly_response(kind, entity_id, semester=None):
+    """ Corps JSON et ETag de la semaine d'une entité, recalculés seulement si elle a été modifiée. """
+    seq = sync_changes()
+    key = (kind, entity_id, semester)
+    with _cache_lock:
+        entry = _cache.get(key)
+        # une réponse calculée avant la dernière modification de l'entité est périmée
+        if entry is not None and entry[0] >= _changed.get((kind, entity_id), 0) and time.monotonic() - entry[1] < CACHE_TTL:
+            _cache.move_to_end(key)
+            return entry[2], entry[3]
+
+    rows = database.get_weekly_timetable(kind, entity_id, semester)
+    body = json.dumps([dict(row) for row in rows], ensure_ascii=False).encode('utf-8')
+    # ETag calculé sur le contenu : un 304 n'est jamais renvoyé pour une semaine modifiée
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    with _cache_lock:
+        _cache[key] = (seq, time.monotonic(), body, etag)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return body, etag
+
+
+class TimetableRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /timetable/<group|instructor|room>/<id>[?semester=S1] : semaine de l'entité en JSON
+    (créneaux du semestre et créneaux sans semestre).
+    """
+
+    # connexions persistantes (keep-alive)
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        parts = path.strip("/").split("/")
+        if len(parts) != 3 or parts[0] != "timetable" or parts[1] not in database.WEEKLY_VIEWS or not parts[2].isdigit():
+            self.send_error(404, "Chemin attendu : /timetable/<group|instructor|room>/<id>")
+            return
+
+        semester = parse_qs(query).get("semester", [None])[0]
+        try:
+            body, etag = weekly_response(parts[1], int(parts[2]), semester)
+        except database.sqlite3.Error as e:
+            self.send_error(500, f"Erreur de la base de données : {e}")
+            return
+        if_none_match = self.headers.get("If-None-Match", "")
+        if if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        # le client garde la réponse mais la revalide à chaque fois (304 si inchangée)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # pas de ligne de journal par requête (20 000 étudiants)
+        pass
+
+
+def serve(host="127.0.0.1", port=8000):
+    # tables, triggers et journal des modifications à jour (ex. base créée avant change_log)
+    database.setup()
+    server = ThreadingHTTPServer((host, port), TimetableRequestHandler)
+    server.daemon_threads = True
+    print(f"Emplois du temps servis sur http://{host}:{port}/timetable/<group|instructor|room>/<id>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8000)